@@ -0,0 +1,62 @@
+# bench_chain_depth.py — stored chain depth vs the old recursive chain_depth
+# Usage: python bench/bench_chain_depth.py [--n 100000] [--k 6]
+from __future__ import annotations
+import argparse, random, sys, time
+from pathlib import Path
+from typing import Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from spiral_core import Event, History  # noqa: E402
+
+def chain_depth_recursive(e: Event, h: History, seen: Set[str]) -> int:
+    # pre-v0.47 implementation, kept here as the reference (exponential on multi-parent DAGs)
+    if e.id in seen: return 999
+    seen.add(e.id)
+    if not e.parent_ids: return 1
+    ds = []
+    for pid in e.parent_ids:
+        pe = h.by_id.get(pid)
+        ds.append(999 if pe is None else 1 + chain_depth_recursive(pe, h, seen.copy()))
+    return max(ds) if ds else 1
+
+def build(n: int, k: int, back: int = 32) -> History:
+    # DAG: every event picks k parents among the previous `back` events
+    h = History()
+    for i in range(n):
+        pool = h.events[-back:]
+        parents = [e.id for e in random.sample(pool, min(k, len(pool)))]
+        h.append(parents, f"evt{i}", meta={"kind": "input"})
+    return h
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--k", type=int, default=6)
+    ap.add_argument("--budget", type=float, default=2.0, help="stop the recursive run once one call exceeds this (s)")
+    a = ap.parse_args()
+    random.seed(7)
+
+    t0 = time.perf_counter(); h = build(a.n, a.k); t_build = time.perf_counter() - t0
+    tail = h.events[-20:]
+    t0 = time.perf_counter()
+    for _ in range(1000): max(h.depth[e.id] for e in tail)
+    t_lookup = (time.perf_counter() - t0) / 1000
+    print(f"stored depth: n={a.n} k={a.k} build+index={t_build:.2f}s "
+          f"max depth over last 20={t_lookup*1e6:.1f}us max_depth={max(h.depth.values())}")
+
+    # recursive reference on growing prefixes of the same DAG until one call blows the budget
+    print("\n  n   recursive(last event)   stored   speedup")
+    n = 8
+    while n <= a.n:
+        e = h.events[n - 1]  # recursion only walks ancestors, so this is the n-event prefix
+        t0 = time.perf_counter(); d_old = chain_depth_recursive(e, h, set()); t_old = time.perf_counter() - t0
+        t0 = time.perf_counter(); d_new = h.depth[e.id]; t_new = max(time.perf_counter() - t0, 1e-9)
+        assert d_old == d_new, (n, d_old, d_new)
+        print(f"{n:5d}   {t_old:12.6f}s          {t_new*1e6:6.2f}us  {t_old/t_new:10.0f}x")
+        if t_old > a.budget: break
+        n += 4
+    print(f"\nrecursive stopped at n={n} (budget {a.budget}s); stored depth answers any of the {a.n} events in O(1).")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
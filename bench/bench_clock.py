@@ -0,0 +1,39 @@
+# bench_clock.py — Clock sources and tick blocks: ns per timestamp, source reads, ordering check
+# Usage: python bench/bench_clock.py [--n 1000000]
+from __future__ import annotations
+import argparse, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+from spiral_core_v047 import Clock, VirtualClock, monotonic_ms, now_ms  # noqa: E402
+
+class Counted:
+    # wraps a source and counts the reads
+    def __init__(self, src): self.src = src; self.reads = 0
+    def __call__(self): self.reads += 1; return self.src()
+
+def run(label: str, clk: Clock, src: Counted, n: int, bulk: bool = False) -> None:
+    t0 = time.perf_counter()
+    if bulk: ts = list(clk.reserve(n))
+    else:
+        tick = clk.tick; ts = [tick() for _ in range(n)]
+    dt = time.perf_counter() - t0
+    assert all(a < b for a, b in zip(ts, ts[1:])), f"{label}: timestamps not strictly increasing"
+    print(f"{label:34}{dt/n*1e9:9.0f}{src.reads:11d}")
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    a = ap.parse_args()
+    print(f"n={a.n} timestamps per row; every row checked strictly increasing\n")
+    print(f"{'clock':34}{'ns/ts':>9}{'reads':>11}")
+    for label, make, kw in (("Clock() wall, v0.46", lambda: now_ms, {}),
+                            ("Clock(monotonic_ms())", monotonic_ms, {}),
+                            ("Clock(monotonic_ms(), block=1024)", monotonic_ms, {"block": 1024}),
+                            ("Clock(VirtualClock())", VirtualClock, {})):
+        src = Counted(make()); run(label, Clock(src, **kw), src, a.n)
+    src = Counted(monotonic_ms()); run("Clock(monotonic_ms()).reserve(n)", Clock(src), src, a.n, bulk=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+# bench_events.py — Event (dataclass) vs CompactEvent (slotted, tuple parents, interned meta): memory per event
+# Usage: python bench/bench_events.py [--n 10000000]
+# Each variant runs in a fresh interpreter; RSS is that of the filled History (events + indexes + id strings).
+from __future__ import annotations
+import argparse, contextlib, gc, io, os, subprocess, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+from spiral_core_v047 import CompactEvent, Event, frontier, print_view  # noqa: E402
+
+CLASSES = {"Event": Event, "CompactEvent": CompactEvent}
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+def own_bytes(e) -> int:
+    # bytes held by one event apart from its ts/id/payload values: object (+__dict__), parents, meta
+    n = sys.getsizeof(e) + sys.getsizeof(e.parent_ids)
+    if hasattr(e, "__dict__"): n += sys.getsizeof(e.__dict__)
+    return n + (sys.getsizeof(e.meta) if type(e.meta) is dict else 0)  # interned meta is shared
+
+def measure(name: str, n: int) -> None:
+    from bench_segments import synth
+    gc.collect(); base = rss_mb(); t0 = time.perf_counter()
+    h = synth(n, event_cls=CLASSES[name])
+    t_build = time.perf_counter() - t0; gc.collect(); rss = rss_mb() - base
+    step = max(1, n // 10_000); own = sum(own_bytes(h.events[i]) for i in range(0, n, step)) / len(range(0, n, step))
+    metas = len({id(h.events[i].meta) for i in range(0, n, step)})
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): print_view("recent", frontier(h, mode="recent"), h)
+    t_view = time.perf_counter() - t0
+    print(f"{name:14}{rss*2**20/n:10.0f}{own:12.0f}{metas:10}{t_build/n*1e9:12.0f}{t_view*1e3:12.1f}{rss:10.0f}")
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=10_000_000)
+    ap.add_argument("--measure", choices=tuple(CLASSES))
+    a = ap.parse_args()
+    if a.measure: measure(a.measure, a.n); return 0
+    print(f"n={a.n} v0.46-shaped events in a History")
+    print(f"\n{'':14}{'RSS B/ev':>10}{'own B/ev':>12}{'metas':>10}{'build ns/ev':>12}{'view ms':>12}{'RSS MB':>10}")
+    for name in CLASSES:
+        subprocess.run([sys.executable, __file__, "--measure", name, "--n", str(a.n)], check=True)
+    print("\nown = event object + __dict__ + parent_ids + per-event meta (sys.getsizeof, 1 in n/10000 sampled); "
+          "metas = distinct meta objects in that sample; view = frontier(recent) + print_view")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+# bench_ids.py — event id generation: v0.46 rnd_id / spiral_core json+sha256 vs IdGenerator modes
+# Usage: python bench/bench_ids.py [--n 200000]
+from __future__ import annotations
+import argparse, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "versions" / "v0.047")); sys.path.insert(0, str(ROOT))
+import spiral_core_v047 as core  # noqa: E402
+from spiral_core_v047 import Event, History, IdGenerator, rnd_id  # noqa: E402
+from spiral_core import _hash  # noqa: E402
+
+def ns_per_call(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n): fn()
+    return (time.perf_counter() - t0) / n * 1e9
+
+def ingest_us(gen: IdGenerator, n: int) -> float:
+    # mk_event + History.add per event, the shape of the demo loop's inputs
+    core.set_id_generator(gen); h = History(); ts = 1_700_000_000_000; pid = None
+    t0 = time.perf_counter()
+    for i in range(n):
+        e = core.mk_event(ts + i, [pid] if pid else [], {"kind": "input", "topic": "xyz"[i % 3]}, f"evt{i}:1234567; topic=x")
+        h.add(e); pid = e.id
+    return (time.perf_counter() - t0) / n * 1e6
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    a = ap.parse_args()
+    ts, par, meta, pay = 1_700_000_000_000, ["4f1c2a9be07d3311"], {"kind": "input", "topic": "x"}, "evt7:1234567; topic=x"
+    raw = {"parent_ids": par, "ts": ts, "payload": pay, "meta": meta}
+    rows = [("v0.46 rnd_id() sha1+time", rnd_id, None),
+            ("spiral_core json+sha256", lambda: _hash(raw), None)]
+    for mode in IdGenerator.MODES:
+        g = IdGenerator(mode); new = g.new
+        rows.append((f"IdGenerator({mode!r})", lambda new=new: new(ts, par, meta, pay), g))
+    base = None
+    print(f"{'id source':28}{'ns/id':>9}{'x rnd_id':>10}{'ingest us/ev':>14}")
+    for label, fn, g in rows:
+        ns = ns_per_call(fn, a.n); base = base or ns
+        ing = f"{ingest_us(g, a.n // 4):14.2f}" if g is not None else f"{'':14}"
+        print(f"{label:28}{ns:9.0f}{base/ns:10.1f}{ing}")
+    print("\nsample ids:", ", ".join(f"{m}={IdGenerator(m).new(ts, par, meta, pay)}" for m in IdGenerator.MODES))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
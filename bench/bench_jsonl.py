@@ -0,0 +1,52 @@
+# bench_jsonl.py — streaming JSONL (export_jsonl / iter_jsonl + History.extend) vs per-line json + add
+# Usage: python bench/bench_jsonl.py [--n 1000000] [--dir /tmp/spiral_bench_jsonl]
+from __future__ import annotations
+import argparse, os, shutil, sys, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+from spiral_core_v047 import History, gc_paused  # noqa: E402
+from spiral_jsonl_v047 import export_jsonl, iter_jsonl  # noqa: E402
+from bench_segments import load_jsonl, save_jsonl, synth, timed  # noqa: E402
+
+def stream_only(path: str) -> tuple:
+    # walk every Event without keeping any: peak traced memory of the reader itself
+    tracemalloc.start(); n = 0
+    with open(path, encoding="utf-8") as f:
+        for _ in iter_jsonl(f): n += 1
+    peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return n, peak
+
+def import_streaming(path: str) -> History:
+    h = History()
+    with gc_paused(), open(path, encoding="utf-8") as f: h.extend(iter_jsonl(f))
+    return h
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--dir", default="/tmp/spiral_bench_jsonl")
+    a = ap.parse_args()
+    shutil.rmtree(a.dir, ignore_errors=True); os.makedirs(a.dir)
+    p_old, p_new = os.path.join(a.dir, "old.jsonl"), os.path.join(a.dir, "new.jsonl")
+
+    h = synth(a.n)
+    t_old, _ = timed(save_jsonl, h, p_old)
+    def export(h, p):
+        with open(p, "w", encoding="utf-8") as f: return export_jsonl(h, f)
+    t_new, _ = timed(export, h, p_new)
+    print(f"n={a.n} events, {os.path.getsize(p_new)/a.n:.0f} B/event (per-line json.dumps file: {os.path.getsize(p_old)/a.n:.0f})")
+    print(f"\n{'':26}{'per-line':>10}{'streaming':>11}{'ratio':>8}")
+    print(f"{'export s':26}{t_old:10.2f}{t_new:11.2f}{t_old/t_new:8.1f}x")
+    t_old, g = timed(load_jsonl, p_new, History); del g
+    t_new, g = timed(import_streaming, p_new)
+    print(f"{'import -> History s':26}{t_old:10.2f}{t_new:11.2f}{t_old/t_new:8.1f}x")
+    assert g.events == h.events and g.by_meta == h.by_meta and g.children == h.children, "round trip differs"
+    del g, h
+    n, peak = stream_only(p_new)
+    print(f"\niter_jsonl over all {n} lines, nothing kept: peak traced memory {peak/1024:.0f} KiB (round trip checked equal)")
+    shutil.rmtree(a.dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
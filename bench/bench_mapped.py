@@ -0,0 +1,51 @@
+# bench_mapped.py — MappedHistory (mmap, decode on access) vs load_segments: open time, RSS, query time
+# Usage: python bench/bench_mapped.py [--n 1000000] [--max-mb 8] [--dir /tmp/spiral_bench_mapped]
+# Each measurement runs in a fresh interpreter so RSS is that of the reader alone.
+from __future__ import annotations
+import argparse, io, contextlib, os, shutil, subprocess, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+from spiral_core_v047 import History, conflict_heat, frontier, gc_paused, print_view  # noqa: E402
+from spiral_segments_v047 import MappedHistory  # noqa: E402
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+def measure(mode: str, path: str) -> None:
+    base = rss_mb(); t0 = time.perf_counter()
+    with gc_paused(): h = MappedHistory(path) if mode == "mapped" else History.load_segments(path)
+    t_open = time.perf_counter() - t0; rss_open = rss_mb() - base
+    t0 = time.perf_counter()
+    for _ in range(10):
+        rows = frontier(h, mode="recent"); frontier(h); conflict_heat(h)
+        with contextlib.redirect_stdout(io.StringIO()): print_view("recent", rows, h)
+    t_q = (time.perf_counter() - t0) / 10
+    t0 = time.perf_counter(); step = max(1, len(h.events) // 1000)
+    for i in range(0, len(h.events), step): h.by_id[h.events[i].id]
+    t_rand = (time.perf_counter() - t0) / (len(h.events) // step) * 1e6
+    print(f"{mode:8}{t_open*1e3:12.1f}{rss_open:12.1f}{t_q*1e3:14.2f}{t_rand:14.1f}{rss_mb()-base:12.1f}")
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--max-mb", type=int, default=8)
+    ap.add_argument("--dir", default="/tmp/spiral_bench_mapped")
+    ap.add_argument("--measure", choices=("mapped", "load"))
+    a = ap.parse_args()
+    if a.measure: measure(a.measure, a.dir); return 0
+
+    from bench_segments import du, synth
+    shutil.rmtree(a.dir, ignore_errors=True)
+    t0 = time.perf_counter(); h = synth(a.n); h.save_segments(a.dir, max_bytes=a.max_mb << 20); del h
+    print(f"n={a.n} events -> {len(os.listdir(a.dir))} segments, {du(a.dir)/a.n:.1f} B/event ({time.perf_counter()-t0:.1f}s)")
+    print(f"\n{'':8}{'open ms':>12}{'RSS open MB':>12}{'query ms':>14}{'by_id+ev us':>14}{'RSS end MB':>12}")
+    for mode in ("mapped", "load"):
+        subprocess.run([sys.executable, __file__, "--measure", mode, "--dir", a.dir], check=True)
+    print("\nquery = frontier(recent) + frontier(global) + conflict_heat + print_view; "
+          "by_id+ev = events[i] then by_id[id] at 1000 spread positions")
+    shutil.rmtree(a.dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
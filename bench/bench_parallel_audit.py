@@ -0,0 +1,58 @@
+# bench_parallel_audit.py — serial invariant_conflict_parents vs spiral_audit_v047.audit_parallel
+# Usage: python bench/bench_parallel_audit.py [--n 2000000] [--workers 4] [--bad 50]
+from __future__ import annotations
+import argparse, os, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+from spiral_core_v047 import ColumnarHistory, Event, History, invariant_conflict_parents  # noqa: E402
+from spiral_audit_v047 import audit_parallel  # noqa: E402
+
+def build(n: int, bad: int, columnar: bool):
+    # demo-shaped log: inputs, a conflict_heat observe on the last two inputs, noise bound to it;
+    # `bad` derived events get a wrong pair (error text depends on which rule they break)
+    h = ColumnarHistory() if columnar else History()
+    rnd = random.Random(47); ts = 1_700_000_000_000; ins = []; obs_p = None
+    bad_at = set(rnd.sample(range(n), bad)) if bad else set()
+    for i in range(n):
+        ts += rnd.choice((0, 1, 1, 2)); eid = f"{i:016x}"
+        r = rnd.random()
+        if len(ins) < 2 or r < 0.6:
+            h.add(Event(ts, eid, [ins[-1]] if ins else [], {"kind": "input", "topic": rnd.choice("xyz")}, f"evt{i}"))
+            ins.append(eid); continue
+        if r < 0.8 or obs_p is None:
+            p = [ins[-2], ins[-1]]
+            if i in bad_at: p = [ins[-1], ins[-2]] if rnd.random() < 0.5 else [ins[-1]]
+            h.add(Event(ts, eid, p, {"kind": "observe", "observe": "conflict_heat"}, "observe=conflict_heat"))
+            obs_p = p
+        else:
+            p = list(obs_p) if i not in bad_at else [ins[-3], ins[-1]]
+            h.add(Event(ts, eid, p, {"kind": "noise", "noise_kind": "conflict(2)"}, "NOISE"))
+    return h
+
+def timed(fn, h):
+    t0 = time.perf_counter()
+    try: fn(h); msg = ""
+    except AssertionError as x: msg = str(x)
+    return time.perf_counter() - t0, msg
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=2_000_000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--bad", type=int, default=50)
+    ap.add_argument("--columnar", action="store_true")
+    a = ap.parse_args()
+
+    t0 = time.perf_counter(); h = build(a.n, a.bad, a.columnar)
+    print(f"built {len(h.events)} events ({type(h).__name__}) in {time.perf_counter()-t0:.1f}s, cpus={os.cpu_count()}")
+    t_ser, m_ser = timed(invariant_conflict_parents, h)
+    print(f"serial              {t_ser:7.2f}s  errors={m_ser.count(chr(10))}")
+    for w in sorted({2, a.workers}):
+        t_par, m_par = timed(lambda h: audit_parallel(h, workers=w), h)
+        assert m_par == m_ser, "parallel audit text differs from serial"
+        print(f"parallel workers={w:<2} {t_par:7.2f}s  x{t_ser/t_par:.2f}  (identical error text)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,50 @@
+# bench_pipeline.py — SpiralPipeline ingestion throughput: inputs/s and derived events/s per configuration
+# Usage: python bench/bench_pipeline.py [--n 1000000] [--chunk 1024]
+from __future__ import annotations
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+import spiral_core_v047 as core  # noqa: E402
+from spiral_core_v047 import Clock, CompactEvent, Event, History, IdGenerator, SimLoop, gc_paused, monotonic_ms  # noqa: E402
+from spiral_pipeline_v047 import SpiralPipeline  # noqa: E402
+
+def inputs(n: int, seed: int = 47) -> list:
+    # main()-shaped inputs: random topic and label, a repair every 9th
+    rnd = random.Random(seed)
+    return [(rnd.choice("xyz"), f"evt{i}:{rnd.randint(1_000_000, 9_999_999)}", rnd.choice("xyz") if i and i % 9 == 0 else None)
+            for i in range(n)]
+
+def run(xs: list, ids: str, block: int, ev, chunk: int, loop: bool = False):
+    core.set_id_generator(IdGenerator(ids)); core.set_event_class(ev)
+    h = History(); clk = Clock(monotonic_ms(), block=block); t0 = time.perf_counter()
+    if loop:
+        sl = SimLoop(h, clk, nonce=core.ID_GEN.nonce)
+        for t, lab, r in xs: sl.step(t, lab, r)
+        nd = len(h.events) - len(xs) - sum(1 for x in xs if x[2])
+    else:
+        p = SpiralPipeline(h, clk, nonce=core.ID_GEN.nonce, chunk=chunk)
+        with gc_paused(): nd = sum(1 for _ in p.push_many(xs))
+    return time.perf_counter() - t0, nd, len(h.events)
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--chunk", type=int, default=1024)
+    a = ap.parse_args()
+    xs = inputs(a.n)
+    print(f"n={a.n} inputs, chunk={a.chunk}")
+    print(f"\n{'':40}{'s':>8}{'inputs/s':>12}{'derived/s':>12}{'events':>10}")
+    for name, ids, block, ev, loop in (
+            ("SimLoop.step, random ids, block=1", "random", 1, Event, True),
+            ("pipeline, random ids, block=1", "random", 1, Event, False),
+            ("pipeline, counter ids, block=1", "counter", 1, Event, False),
+            ("pipeline, counter ids, block=1024", "counter", 1024, Event, False),
+            ("pipeline, counter, block=1024, Compact", "counter", 1024, CompactEvent, False)):
+        dt, nd, ne = run(xs, ids, block, ev, a.chunk, loop)
+        print(f"{name:40}{dt:8.2f}{a.n/dt:12.0f}{nd/dt:12.0f}{ne:10}")
+    core.set_id_generator(IdGenerator()); core.set_event_class(Event)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
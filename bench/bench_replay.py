@@ -0,0 +1,51 @@
+# bench_replay.py — deterministic replay of the v0.46 decision loop: steps/s, events/s, digest stability
+# Usage: python bench/bench_replay.py [--n 200000]
+from __future__ import annotations
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+import spiral_core_v047 as core  # noqa: E402
+from spiral_core_v047 import ColumnarHistory, CompactEvent, Event, History  # noqa: E402
+from spiral_replay_v047 import digest, replay  # noqa: E402
+
+def script(n: int, seed: int = 47) -> list:
+    # main()-shaped input script: random topics and labels, a repair every 9th step, 1..5 ms between inputs
+    rnd = random.Random(seed); ts = 1_700_000_000_000; steps = []
+    for i in range(n):
+        ts += rnd.randint(1, 5); s = {"ts": ts, "topic": rnd.choice("xyz"), "label": f"evt{i}:{rnd.randint(1_000_000, 9_999_999)}"}
+        if i and i % 9 == 0: ts += 1; s["repair"] = [ts, rnd.choice("xyz")]
+        steps.append(s)
+    if steps: steps[0]["seed"] = True
+    return steps
+
+def live(steps: list) -> History:
+    # the same steps through SimLoop as main() runs it: wall Clock, random ids and nonces
+    h = History(); loop = core.SimLoop(h, core.Clock()); core.InvariantMonitor(h)
+    for s in steps:
+        loop.input(s["topic"], s["label"])
+        if "repair" in s: loop.repair(s["repair"][1])
+        if not s.get("seed"): loop.derive()
+    return h
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    a = ap.parse_args()
+    steps = script(a.n)
+    print(f"n={a.n} steps")
+    print(f"\n{'':28}{'s':>8}{'steps/s':>12}{'events/s':>12}{'events':>10}  digest")
+    digests = set()
+    for name, cls, ev in (("History", History, Event), ("History + CompactEvent", History, CompactEvent),
+                          ("ColumnarHistory", ColumnarHistory, Event), ("History, check=False", History, Event)):
+        core.set_event_class(ev); t0 = time.perf_counter()
+        h = replay(steps, cls, check=name != "History, check=False")
+        dt = time.perf_counter() - t0; d = digest(h); digests.add(d)
+        print(f"{name:28}{dt:8.2f}{a.n/dt:12.0f}{len(h.events)/dt:12.0f}{len(h.events):10}  {d}")
+    core.set_event_class(Event); t0 = time.perf_counter(); h = live(steps); dt = time.perf_counter() - t0
+    print(f"{'live: wall Clock, random ids':28}{dt:8.2f}{a.n/dt:12.0f}{len(h.events)/dt:12.0f}{len(h.events):10}  {digest(h)}")
+    print(f"\nbyte-identical across runs: {len(digests) == 1}")
+    return 0 if len(digests) == 1 else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+# bench_segments.py — binary segment log vs JSONL: bytes on disk, save time, load time
+# Usage: python bench/bench_segments.py [--n 1000000] [--dir /tmp/spiral_bench]
+from __future__ import annotations
+import argparse, json, os, random, shutil, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+from spiral_core_v047 import ColumnarHistory, Event, History, gc_paused  # noqa: E402
+
+def synth(n: int, seed: int = 47, columnar: bool = False, event_cls=Event):
+    # v0.46-shaped stream: random 16-hex ids, inputs chained to the previous event (15% back-refs),
+    # a conflict_heat observe on the last two inputs, conflict(2) noise bound to it; real payload shapes.
+    # event_cls builds the events (Event or CompactEvent)
+    rnd = random.Random(seed); h = ColumnarHistory() if columnar else History()
+    ts = 1_700_000_000_000; ins = []; last = None; obs_p = None
+    for i in range(n):
+        ts += rnd.choice((0, 1, 1, 2)); eid = f"{rnd.getrandbits(64):016x}"; r = rnd.random()
+        if len(ins) < 2 or r < 0.6:
+            t = rnd.choice("xyz"); lab = f"evt{i}:{rnd.randint(1_000_000, 9_999_999)}"
+            p = [rnd.choice(ins[-12:])] if ins and rnd.random() < 0.15 else ([last] if last else [])
+            e = event_cls(ts, eid, p, {"kind": "input", "topic": t}, f"{lab}; topic={t}"); ins.append(eid)
+        elif r < 0.8 or obs_p is None:
+            obs_p = [ins[-2], ins[-1]]; heat = rnd.randint(1, 9)
+            e = event_cls(ts, eid, obs_p, {"kind": "observe", "observe": "conflict_heat"},
+                      f"observe=conflict_heat; win=14; total_heat={heat}; top=topic:{heat}:{rnd.choice('xyz')}:{rnd.randint(1, 14)}")
+        else:
+            t = rnd.choice("xyz")
+            e = event_cls(ts, eid, list(obs_p), {"kind": "noise", "noise_kind": "conflict(2)"},
+                      f"NOISE:{rnd.getrandbits(64):016x}:conflict(2):top=topic:3:{t}:5:evt{i}:{rnd.randint(1_000_000, 9_999_999)}; topic={t}")
+        h.add(e); last = eid
+    return h
+
+def save_jsonl(h, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for e in h.events:
+            f.write(json.dumps({"ts": e.ts, "id": e.id, "parent_ids": e.parent_ids, "meta": e.meta, "payload": e.payload},
+                               ensure_ascii=False) + "\n")
+
+def load_jsonl(path: str, cls):
+    h = cls()
+    with open(path, encoding="utf-8") as f:
+        for line in f: h.add(Event(**json.loads(line)))
+    return h
+
+def du(path: str) -> int:
+    return os.path.getsize(path) if os.path.isfile(path) else sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+def timed(fn, *a):
+    t0 = time.perf_counter(); r = fn(*a); return time.perf_counter() - t0, r
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--dir", default="/tmp/spiral_bench_segments")
+    a = ap.parse_args()
+    shutil.rmtree(a.dir, ignore_errors=True); os.makedirs(a.dir)
+    jl, sg = os.path.join(a.dir, "h.jsonl"), os.path.join(a.dir, "seg")
+
+    t0 = time.perf_counter(); h = synth(a.n)
+    print(f"n={a.n} events, built in {time.perf_counter()-t0:.1f}s")
+    t_js, _ = timed(save_jsonl, h, jl)
+    t_ss, _ = timed(h.save_segments, sg)
+    sg0 = sg + "-noindex"; h.save_segments(sg0, index=False)
+    s_js, s_sg, s_sg0 = du(jl), du(sg), du(sg0)
+    print(f"\n{'':22}{'JSONL':>12}{'segments':>12}{'ratio':>8}")
+    print(f"{'bytes':22}{s_js:12d}{s_sg:12d}{s_js/s_sg:8.1f}x   ({s_js/a.n:.0f} vs {s_sg/a.n:.1f} B/event)")
+    print(f"{'bytes, index=False':22}{s_js:12d}{s_sg0:12d}{s_js/s_sg0:8.1f}x   ({s_js/a.n:.0f} vs {s_sg0/a.n:.1f} B/event)")
+    print(f"{'save s':22}{t_js:12.2f}{t_ss:12.2f}{t_js/t_ss:8.1f}x")
+    del h
+    for cls in (History, ColumnarHistory):
+        t_jl, g1 = timed(load_jsonl, jl, cls); del g1
+        with gc_paused(): t_sl, g2 = timed(cls.load_segments, sg)
+        del g2
+        print(f"{'load -> ' + cls.__name__ + ' s':22}{t_jl:12.2f}{t_sl:12.2f}{t_jl/t_sl:8.1f}x")
+    shutil.rmtree(a.dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
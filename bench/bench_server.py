@@ -0,0 +1,80 @@
+# bench_server.py — load generator for spiral_server_v047: append latency p50/p99 under many producers
+# Usage: python bench/bench_server.py [--n 200000] [--producers 8] [--window 64] [--queue 4096] [--tcp]
+#        python bench/bench_server.py --connect /tmp/spiral.sock   (against a server already running)
+# The server runs in its own interpreter. Latency = input line written -> its ack read ({"n":...}),
+# i.e. queueing + one writer batch + the reply. A reader polls {"op":"frontier"} throughout.
+from __future__ import annotations
+import argparse, asyncio, json, os, random, subprocess, sys, time
+from collections import deque
+from pathlib import Path
+
+SERVER = Path(__file__).resolve().parents[1] / "versions" / "v0.047" / "spiral_server_v047.py"
+
+def pct(xs: list, p: float) -> float:
+    return xs[min(len(xs) - 1, int(p / 100 * len(xs)))] * 1e3 if xs else float("nan")
+
+async def connect(addr):
+    return await (asyncio.open_connection("127.0.0.1", addr) if isinstance(addr, int) else asyncio.open_unix_connection(addr))
+
+async def producer(addr, k: int, n: int, window: int, lat: list) -> None:
+    # n inputs with at most `window` unacked; acks come back in order, so a FIFO of send times matches them
+    r, w = await connect(addr); rnd = random.Random(k); sent = deque(); free = asyncio.Semaphore(window)
+    async def acks():
+        for _ in range(n):
+            line = await r.readline()
+            if b'"error"' in line: raise RuntimeError(line.decode())
+            lat.append(time.perf_counter() - sent.popleft()); free.release()
+    reader = asyncio.create_task(acks())
+    for i in range(n):
+        await free.acquire()
+        t = rnd.choice("xyz"); rep = f',"repair":"{rnd.choice("xyz")}"' if i and i % 9 == 0 else ""
+        sent.append(time.perf_counter())
+        w.write(f'{{"topic":"{t}","label":"p{k}:evt{i}:{rnd.randint(1_000_000, 9_999_999)}"{rep}}}\n'.encode())
+        if not i % window: await w.drain()
+    await reader; w.close()
+
+async def poller(addr, every_ms: float, lat: list, stop: asyncio.Event, last: list) -> None:
+    r, w = await connect(addr)
+    while not stop.is_set():
+        t0 = time.perf_counter(); w.write(b'{"op":"frontier"}\n'); line = await r.readline()
+        lat.append(time.perf_counter() - t0); last[:] = [line]
+        await asyncio.sleep(every_ms / 1000)
+    w.close()
+
+async def load(addr, n: int, producers: int, window: int) -> None:
+    lat: list = []; flat: list = []; last: list = []; stop = asyncio.Event()
+    poll = asyncio.create_task(poller(addr, 20, flat, stop, last))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(producer(addr, k, n // producers, window, lat) for k in range(producers)))
+    dt = time.perf_counter() - t0; stop.set(); await poll
+    lat.sort(); flat.sort(); snap = json.loads(last[0]) if last else {}
+    print(f"{len(lat)} inputs from {producers} producers (window {window}) in {dt:.2f}s: {len(lat)/dt:,.0f} inputs/s")
+    print(f"append latency ms   p50 {pct(lat, 50):8.2f}   p99 {pct(lat, 99):8.2f}   max {lat[-1]*1e3:8.2f}")
+    print(f"frontier read ms    p50 {pct(flat, 50):8.2f}   p99 {pct(flat, 99):8.2f}   ({len(flat)} reads)")
+    print(f"last snapshot: n={snap.get('n')} inputs={snap.get('inputs')} derived={snap.get('derived')} "
+          f"recent={len(snap.get('recent', []))} global={len(snap.get('global', []))}")
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--producers", type=int, default=8)
+    ap.add_argument("--window", type=int, default=64)
+    ap.add_argument("--queue", type=int, default=4096)
+    ap.add_argument("--tcp", action="store_true")
+    ap.add_argument("--connect", help="unix socket path or TCP port of a running server")
+    a = ap.parse_args()
+    if a.connect:
+        asyncio.run(load(int(a.connect) if a.connect.isdigit() else a.connect, a.n, a.producers, a.window)); return 0
+    sock = f"/tmp/spiral_bench_{os.getpid()}.sock"
+    cmd = [sys.executable, str(SERVER), "--queue", str(a.queue)] + (["--port", "0"] if a.tcp else ["--unix", sock])
+    srv = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    try:
+        where = srv.stdout.readline().split()[-1]  # "listening on <path | 127.0.0.1:port>"
+        addr = int(where.rsplit(":", 1)[1]) if a.tcp else where
+        asyncio.run(load(addr, a.n, a.producers, a.window))
+    finally:
+        srv.terminate(); srv.wait()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
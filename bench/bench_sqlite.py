@@ -0,0 +1,56 @@
+# bench_sqlite.py — SqliteHistory: insert throughput by transaction batch, query latency vs in-memory History
+# Usage: python bench/bench_sqlite.py [--n 200000] [--dir /tmp/spiral_bench_sqlite]
+from __future__ import annotations
+import argparse, os, shutil, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+import spiral_core_v047 as core  # noqa: E402
+from spiral_core_v047 import History, conflict_heat, frontier  # noqa: E402
+from spiral_sqlite_v047 import SqliteHistory  # noqa: E402
+from bench_segments import synth  # noqa: E402
+
+def per_call_ms(fn, reps=20):
+    t0 = time.perf_counter()
+    for _ in range(reps): fn()
+    return (time.perf_counter() - t0) / reps * 1e3
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--dir", default="/tmp/spiral_bench_sqlite")
+    a = ap.parse_args()
+    shutil.rmtree(a.dir, ignore_errors=True); os.makedirs(a.dir)
+    h = synth(a.n); evs = h.events
+    print(f"n={a.n} v0.46-shaped events, database in {a.dir}\n")
+    print(f"{'insert':28}{'events':>9}{'events/s':>11}")
+    s = None
+    for batch, share in ((1, 0.01), (64, 0.2), (4096, 1.0)):
+        m = max(1, int(a.n * share)); p = os.path.join(a.dir, f"b{batch}.db")
+        s = SqliteHistory(p, batch=batch)
+        t0 = time.perf_counter()
+        for e in evs[:m]: s.add(e)
+        s.flush(); dt = time.perf_counter() - t0
+        print(f"{f'batch={batch} (txn per {batch})':28}{m:9d}{m/dt:11.0f}")
+        if batch != 4096: s.close()
+    t0 = time.perf_counter(); g = History()
+    for e in evs: g.add(e)
+    print(f"{'History.add (memory)':28}{a.n:9d}{a.n/(time.perf_counter()-t0):11.0f}")
+
+    assert frontier(s, mode="recent") == frontier(h, mode="recent") and frontier(s) == frontier(h)
+    seeds = [e.id for e in evs[-12:]]
+    print(f"\n{'query (ms/call)':28}{'History':>10}{'Sqlite':>10}")
+    rows = [
+        ("last(14, kind=input)", lambda x: x.last(14, kind="input")),
+        ("conflict_heat", conflict_heat),
+        ("closure(12 seeds, depth 6)", lambda x: core.closure(x, seeds, 6)),
+        ("frontier recent", lambda x: frontier(x, mode="recent")),
+        ("frontier global", lambda x: frontier(x)),
+    ]
+    for label, fn in rows:
+        print(f"{label:28}{per_call_ms(lambda: fn(h)):10.3f}{per_call_ms(lambda: fn(s)):10.3f}")
+    s.close(); shutil.rmtree(a.dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+# bench_v038_demo_loop.py — per-step cost of the v0.038 demo() loop as history grows
+# Usage: python bench/bench_v038_demo_loop.py [--n 1000000] [--chunks 10] [--baseline 20000]
+from __future__ import annotations
+import argparse, random, runpy, time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+V038 = ROOT / "versions" / "v0.038" / "spiral_core_v038_a-only.py"
+
+def reparse(g: Dict) -> None:
+    # pre-v0.47 reference: re-parse every payload in the window on each conflict_heat call
+    parse_kv, NoiseEngine = g["parse_kv"], g["NoiseEngineAOnly"]
+    def conflict_heat(h, win: int) -> Tuple[int, List[Tuple[str,int,str,int]]]:
+        tail = [e for e in h.events[-win:] if e.meta.get("kind") == "input"]
+        vals: Dict[str, List[str]] = {}
+        for e in tail:
+            for k, v in parse_kv(e.payload).items(): vals.setdefault(k, []).append(v)
+        rows = []
+        for k, vs in vals.items():
+            heat = max(0, len(set(vs))-1)
+            dom_v, dom_c = Counter(vs).most_common(1)[0]
+            rows.append((k, heat, dom_v, dom_c))
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return sum(r[1] for r in rows), rows
+    def conflicting_inputs(self, h) -> List:
+        total, rows = conflict_heat(h, self.win)
+        if total <= 0: return []
+        keys = {k for (k, heat, _, _) in rows if heat >= 1}
+        tail = [e for e in h.events[-self.win:] if e.meta.get("kind") == "input"]
+        return [e for e in tail if any(k in keys for k in parse_kv(e.payload))]
+    g["conflict_heat"] = conflict_heat
+    NoiseEngine.conflicting_inputs = conflicting_inputs
+
+def run(n: int, chunks: int, baseline: bool = False) -> List[Tuple[int, int, float]]:
+    # the demo() input loop (accept, observe gate, noise gate) for n inputs; (inputs, events, us/step) per chunk
+    g = runpy.run_path(str(V038))
+    if baseline: reparse(g)
+    h = g["History"]()
+    eng = g["NoiseEngineAOnly"](seed=38, win=14, conflict_thr=2, d_thr=14, n_thr=120,
+                                backref_prob=0.15, conflict_noise_cooldown=2)
+    obs = g["ObserveGate"](cooldown_inputs=2)
+    accept, topics = g["accept"], ["x","y","z"]
+    step = max(1, n // chunks); out = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        t = random.choice(["x","y"]) if i % 4 in (0,1) else random.choice(topics)
+        accept(h, eng, f"evt{i}:{random.randint(10**6,10**7-1)}; topic={t}")
+        eng.on_input(); obs.on_input()
+        obs.maybe_observe(h, eng.win, topn=3)
+        ok, reason = eng.should_noise(h)
+        if ok: eng.emit_noise(h, reason)
+        if (i + 1) % step == 0:
+            t1 = time.perf_counter()
+            out.append((i + 1, len(h.events), (t1 - t0) / step * 1e6)); t0 = t1
+    return out
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--chunks", type=int, default=10)
+    ap.add_argument("--baseline", type=int, default=20_000, help="inputs for the re-parse reference run (0 = skip)")
+    a = ap.parse_args()
+
+    print(f"v0.038 demo loop, cached kv + h.inputs: n={a.n}")
+    print("   inputs     events   us/step")
+    for i, ev, us in run(a.n, a.chunks):
+        print(f"{i:9d}  {ev:9d}  {us:8.2f}")
+    if a.baseline:
+        k = min(a.chunks, a.baseline)
+        cur, ref = run(a.baseline, k), run(a.baseline, k, baseline=True)
+        print(f"\nre-parse reference vs cached, n={a.baseline} (same loop, conflict_heat rebuilt per call)")
+        print("   inputs   reparse us   cached us")
+        for (i, _, us_c), (_, _, us_r) in zip(cur, ref):
+            print(f"{i:9d}  {us_r:10.2f}  {us_c:10.2f}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+# bench_wal.py — durable ingestion: History.add + WriteAheadLog under different group-commit policies
+# Usage: python bench/bench_wal.py [--n 300000] [--dir /tmp/spiral_bench_wal]
+# --dir should sit on the disk under test (tmpfs turns fsync into a no-op).
+from __future__ import annotations
+import argparse, os, shutil, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+from spiral_core_v047 import History  # noqa: E402
+from spiral_wal_v047 import WriteAheadLog  # noqa: E402
+from bench_segments import synth  # noqa: E402
+
+POLICIES = [  # (label, WriteAheadLog kwargs or None for memory only, share of n to ingest)
+    ("memory only (no WAL)", None, 1.0),
+    ("fsync=False", {"fsync": False}, 1.0),
+    ("sync_every=1", {"sync_every": 1}, 0.01),
+    ("sync_every=16", {"sync_every": 16}, 0.1),
+    ("sync_every=256", {"sync_every": 256}, 1.0),
+    ("sync_every=4096", {"sync_every": 4096}, 1.0),
+    ("sync_ms=5", {"sync_every": 1 << 30, "sync_ms": 5}, 1.0),
+    ("sync_ms=50", {"sync_every": 1 << 30, "sync_ms": 50}, 1.0),
+]
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=300_000)
+    ap.add_argument("--dir", default="/tmp/spiral_bench_wal")
+    a = ap.parse_args()
+    shutil.rmtree(a.dir, ignore_errors=True); os.makedirs(a.dir)
+    evs = synth(a.n).events
+    print(f"n={a.n} v0.46-shaped events, WAL in {a.dir}\n")
+    print(f"{'policy':24}{'events':>9}{'events/s':>11}{'commits':>9}{'worst loss':>12}")
+    for label, kw, share in POLICIES:
+        m = max(1, int(a.n * share)); p = os.path.join(a.dir, "h.wal")
+        if os.path.exists(p): os.remove(p)
+        h = History(); wal = None
+        if kw is not None: wal = WriteAheadLog(p, **kw); wal.attach(h)
+        t0 = time.perf_counter()
+        for e in evs[:m]: h.add(e)
+        if wal is not None: wal.close()
+        dt = time.perf_counter() - t0
+        loss = "-" if kw is None else ("page cache" if not kw.get("fsync", True) else
+               f"{kw['sync_ms']} ms" if "sync_ms" in kw else f"{kw['sync_every']} ev")
+        print(f"{label:24}{m:9d}{m/dt:11.0f}{(wal.commits if wal else 0):9d}{loss:>12}")
+    t0 = time.perf_counter(); g = WriteAheadLog(p).replay(History()); dt = time.perf_counter() - t0
+    assert g.events == evs[:len(g.events)]
+    print(f"\nreplay {len(g.events)} events: {len(g.events)/dt:.0f} events/s ({os.path.getsize(p)/len(g.events):.0f} B/event on disk)")
+    shutil.rmtree(a.dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,7 @@
 Stable entrypoint for spiral-core-series.
 
 - Keeps README/quickstart stable across versions.
-- Default target: v0.046 prototype script.
+- Default target: v0.047 prototype script.
 - When shipping a new version (e.g. v0.047), only update TARGET below.
 """
 
@@ -14,7 +14,7 @@ from pathlib import Path
 import sys
 
 # Update this when a new version becomes the "latest".
-TARGET = Path("versions") / "v0.046" / "spiral_core_v046_frontier-recent-k-fix.py"
+TARGET = Path("versions") / "v0.047" / "spiral_core_v047.py"
 
 
 def main() -> int:
@@ -9,9 +9,11 @@ def _hash(obj: dict) -> str:
     b = json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")
     return hashlib.sha256(b).hexdigest()[:16]
 
+_MONO_ANCHOR = time.time_ns() // 1_000_000 - time.monotonic_ns() // 1_000_000
+
 def _mono_ts() -> int:
-    # monotonic-ish ordering for demo; replace with real monotonic clock if needed
-    return int(time.time() * 1000)
+    # wall-clock ms anchored once, advanced by time.monotonic_ns(): never steps back (NTP, DST)
+    return _MONO_ANCHOR + time.monotonic_ns() // 1_000_000
 
 @dataclass(frozen=True)
 class Event:
@@ -25,11 +27,13 @@ class History:
     def __init__(self) -> None:
         self.events: List[Event] = []
         self.by_id: Dict[str, Event] = {}
+        self.depth: Dict[str, int] = {}  # chain depth, 1 + max(parent depth); missing parent -> 999
 
     def append(self, parent_ids: List[str], payload: str, meta: Optional[Dict[str,str]]=None) -> Event:
         meta = meta or {}
         raw = {"parent_ids": parent_ids, "ts": _mono_ts(), "payload": payload, "meta": meta}
         eid = _hash(raw)
+        self.depth[eid] = max((1 + self.depth[p] if p in self.depth else 999 for p in parent_ids), default=1)
         ev = Event(id=eid, parent_ids=list(parent_ids), ts=raw["ts"], payload=payload, meta=meta)
         self.events.append(ev)
         self.by_id[eid] = ev
@@ -50,14 +54,8 @@ def traceable(e: Event, h: History) -> bool:
         if pid not in h.by_id: 
             return False
     # bounded depth check: if any chain exceeds 6, mark as hard-to-trace
-    def depth(x: Event, seen: Set[str]) -> int:
-        if x.id in seen: 
-            return 999
-        seen.add(x.id)
-        if not x.parent_ids:
-            return 1
-        return 1 + max(depth(h.by_id[p], seen.copy()) for p in x.parent_ids if p in h.by_id)
-    return depth(e, set()) <= 6
+    # (stored depth; a missing ancestor counts as 999, i.e. hard-to-trace)
+    return h.depth[e.id] <= 6
 
 class NoiseEngine:
     def __init__(self, N: int=50, D: int=8, P: float=0.25, seed: int=7) -> None:
@@ -65,19 +63,8 @@ class NoiseEngine:
         random.seed(seed)
 
     def _chain_depth(self, e: Event, h: History, seen: Set[str]) -> int:
-        if e.id in seen: 
-            return 999
-        seen.add(e.id)
-        if not e.parent_ids:
-            return 1
-        depths = []
-        for pid in e.parent_ids:
-            pe = h.by_id.get(pid)
-            if pe is None:
-                depths.append(999)
-            else:
-                depths.append(1 + self._chain_depth(pe, h, seen.copy()))
-        return max(depths) if depths else 1
+        # O(1): depth is stored per event by History.append (seen kept for call-site compat)
+        return h.depth[e.id]
 
     def should_noise(self, h: History) -> bool:
         if len(h.events) >= self.N:
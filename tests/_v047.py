@@ -0,0 +1,30 @@
+# _v047.py — shared setup for the v0.047 tests: import path and a small deterministic SimLoop run
+from __future__ import annotations
+import random, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "versions" / "v0.047"))
+import spiral_core_v047 as core  # noqa: E402
+from spiral_core_v047 import Clock, IdGenerator, SimLoop  # noqa: E402
+
+def ids(evs):
+    return [e.id for e in evs]
+
+def run_loop(h, steps, seed=7, on_step=None, id_start=0):
+    # main()-shaped run into h: counter ids from id_start, a virtual clock with 0-3 ms between reads,
+    # a repair every 9th step
+    rnd = random.Random(seed); t = [1_700_000_000_000]
+    def src():
+        t[0] += rnd.choice((0, 1, 1, 3)); return t[0]
+    gen = IdGenerator("counter", id_start); prev = core.ID_GEN; core.set_id_generator(gen)
+    try:
+        loop = SimLoop(h, Clock(src), nonce=gen.nonce)
+        loop.input("x", "evt0")
+        for i in range(1, steps):
+            loop.input(rnd.choice("xyz"), f"evt{i}")
+            if i % 9 == 0: loop.repair(rnd.choice("xyz"))
+            loop.derive()
+            if on_step: on_step(i)
+    finally:
+        core.set_id_generator(prev)
+    return h
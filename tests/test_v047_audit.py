@@ -0,0 +1,54 @@
+# test_v047_audit.py — audit_parallel against invariant_conflict_parents: same verdict, same error text
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import random, unittest
+
+from _v047 import run_loop
+from spiral_audit_v047 import audit_parallel
+from spiral_core_v047 import ColumnarHistory, Event, History, invariant_conflict_parents
+
+def broken(seed, n):
+    # inputs, conflict_heat observes with 1-3 parents and noise that mostly (not always) reuses the last
+    # observe's parents, dangling parents and runs of equal ts: every kind of audit error, spread out
+    r = random.Random(seed); evs = []; ts = 1000; last_obs = None
+    for _ in range(n):
+        ts += r.choice((0, 1, 1, 2)); ids = [e.id for e in evs]
+        def pick(): return f"{r.getrandbits(64):016x}" if r.random() < 0.05 or not ids else r.choice(ids[-8:])
+        k = r.choice(("input", "input", "input", "observe", "noise"))
+        if k == "input": par = [pick()] if ids else []; meta = {"kind": "input", "topic": r.choice("xy")}
+        elif k == "observe":
+            par = [pick() for _ in range(r.choice((2, 2, 2, 1, 3)))]; meta = {"kind": "observe", "observe": "conflict_heat"}
+        else:
+            par = list(last_obs.parent_ids) if last_obs and r.random() < 0.7 else [pick(), pick()]
+            meta = {"kind": "noise", "noise_kind": "conflict(2)"}
+        e = Event(ts, f"{r.getrandbits(64):016x}", par, meta, "p"); evs.append(e)
+        if k == "observe": last_obs = e
+    return evs
+
+def verdict(fn, h):
+    try: fn(h); return None
+    except AssertionError as x: return str(x)
+
+class AuditParallelTest(unittest.TestCase):
+    def test_same_errors_as_serial(self):
+        failing = 0
+        for seed in range(8):
+            evs = broken(seed, random.Random(seed).randint(20, 150))
+            for cls in (History, ColumnarHistory):
+                h = cls(); h.extend(evs); want = verdict(invariant_conflict_parents, h); failing += want is not None
+                for chunk in (1, 7, 50):
+                    self.assertEqual(verdict(lambda h: audit_parallel(h, workers=2, chunk=chunk), h), want,
+                                     (seed, cls.__name__, chunk))
+        self.assertGreater(failing, 8)
+
+    def test_clean_run(self):
+        h = run_loop(History(), 300)
+        self.assertIsNone(verdict(lambda h: audit_parallel(h, workers=3), h))
+
+    def test_out_of_order_ts_runs_serially(self):
+        evs = broken(3, 80); evs[40], evs[41] = evs[41], evs[40]
+        h = History(); h.extend(evs); self.assertFalse(h.ts_sorted)
+        self.assertEqual(verdict(lambda h: audit_parallel(h, workers=2), h), verdict(invariant_conflict_parents, h))
+
+if __name__ == "__main__":
+    unittest.main()
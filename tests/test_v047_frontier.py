@@ -0,0 +1,29 @@
+# test_v047_frontier.py — RecentAFrontier (incremental) against frontier(mode="recent") (batch)
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import unittest
+
+from _v047 import ids, run_loop
+from spiral_core_v047 import History, RecentAFrontier, frontier
+
+class RecentAFrontierTest(unittest.TestCase):
+    def test_matches_batch_frontier_after_every_step(self):
+        h = History(); rf = RecentAFrontier(h)
+        def check(i):
+            self.assertEqual(set(ids(rf.view(topk=len(h.events)))),
+                             set(ids(frontier(h, mode="recent", topk=len(h.events)))), f"step {i}")
+            self.assertEqual(ids(rf.view(20)), ids(frontier(h, mode="recent", topk=20)), f"step {i}")
+        run_loop(h, 300, on_step=check)
+
+    def test_attached_to_a_non_empty_history(self):
+        h = run_loop(History(), 150, seed=3); rf = RecentAFrontier(h)
+        self.assertEqual(ids(rf.view(20)), ids(frontier(h, mode="recent", topk=20)))
+
+    def test_other_parameters(self):
+        h = History(); rf = RecentAFrontier(h, last_inputs=2, last_observes=1, anc_depth=3, recent_k=5)
+        run_loop(h, 200, seed=11)
+        self.assertEqual(ids(rf.view(30)), ids(frontier(h, mode="recent", topk=30, last_inputs=2,
+                                                         last_observes=1, anc_depth=3, recent_k=5)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+# test_v047_heat.py — ConflictHeatTracker (incremental) against conflict_heat (batch)
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import random, unittest
+
+from _v047 import run_loop
+from spiral_core_v047 import ConflictHeatTracker, Event, History, conflict_heat
+
+class ConflictHeatTrackerTest(unittest.TestCase):
+    def test_matches_batch_after_every_step(self):
+        h = History(); trs = {w: ConflictHeatTracker(h, w) for w in (1, 2, 5, 14)}
+        def check(i):
+            for w, tr in trs.items(): self.assertEqual(tr.value(), conflict_heat(h, w), f"step {i} win {w}")
+        run_loop(h, 300, on_step=check)
+
+    def test_many_topics_and_count_ties(self):
+        # dominant-topic ties are broken by first occurrence in the window, as max() over the counts dict
+        rnd = random.Random(5); h = History(); trs = {w: ConflictHeatTracker(h, w) for w in (3, 8, 14)}
+        self.assertEqual(trs[3].value(), conflict_heat(h, 3))
+        for i in range(2000):
+            kind = rnd.choice(("input", "input", "input", "observe"))
+            h.add(Event(1000 + i, f"{i:016x}", [], {"kind": kind, "topic": rnd.choice("abcdefg")}, f"evt{i}"))
+            for w, tr in trs.items(): self.assertEqual(tr.value(), conflict_heat(h, w), f"event {i} win {w}")
+
+    def test_attached_to_a_non_empty_history(self):
+        h = run_loop(History(), 120, seed=3); tr = ConflictHeatTracker(h, 14)
+        self.assertEqual(tr.value(), conflict_heat(h, 14))
+        for i, t in enumerate("xxyzzyx"):
+            h.add(Event(h.ts[-1] + 1, f"{i:016x}ff", [], {"kind": "input", "topic": t}, f"more{i}"))
+            self.assertEqual(tr.value(), conflict_heat(h, 14))
+
+    def test_bad_window(self):
+        with self.assertRaises(ValueError): ConflictHeatTracker(None, 0)
+
+if __name__ == "__main__":
+    unittest.main()
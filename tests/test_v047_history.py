@@ -0,0 +1,54 @@
+# test_v047_history.py — an add that raises leaves History / ColumnarHistory as they were; gc_paused
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import gc, unittest
+
+from _v047 import core  # noqa: F401  (import path)
+from spiral_core_v047 import ColumnarHistory, Event, History, gc_paused
+
+def ev(i, **meta):
+    return Event(1000 + i, f"{i:016x}", [f"{i-1:016x}"] if i else [], {"kind": "input", **meta}, f"evt{i}")
+
+class UnhashableMetaTest(unittest.TestCase):
+    def check(self, h, n):
+        self.assertEqual(len(h.events), n); self.assertEqual(len(h.ts), n)
+        self.assertEqual([e.id for e in h.select(kind="input")], [f"{i:016x}" for i in range(n)])
+        self.assertEqual([e.id for e in h.children_of(f"{n-1:016x}")], [])
+
+    def test_add(self):
+        for cls in (History, ColumnarHistory):
+            h = cls(); h.add(ev(0, topic="x"))
+            with self.assertRaises(TypeError): h.add(ev(1, topic=["x"]))
+            self.check(h, 1)
+            h.add(ev(1, topic="y")); self.check(h, 2)
+            self.assertEqual([e.id for e in h.select(topic="y")], [f"{1:016x}"])
+
+    def test_extend(self):
+        h = History(); h.extend([ev(0, topic="x")])
+        with self.assertRaises(TypeError): h.extend([ev(1, topic="x"), ev(2, topic=["x"])])
+        self.check(h, 1)
+        h.extend([ev(1, topic="x"), ev(2, topic="y")]); self.check(h, 3)
+        self.assertEqual([e.id for e in h.select(topic="x")], [f"{0:016x}", f"{1:016x}"])
+
+class GcPausedTest(unittest.TestCase):
+    def test_restores_previous_state(self):
+        self.assertTrue(gc.isenabled())
+        with self.assertRaises(KeyError), gc_paused():
+            self.assertFalse(gc.isenabled()); raise KeyError
+        self.assertTrue(gc.isenabled())
+        gc.disable()
+        try:
+            with gc_paused(): pass
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+
+    def test_extend_leaves_gc_alone(self):
+        seen = []
+        def events():
+            for i in range(10): seen.append(gc.isenabled()); yield ev(i)
+        History().extend(events())
+        self.assertEqual(seen, [True] * 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# test_v047_ids.py — IdGenerator ids and nonces; ColumnarHistory keeps non-canonical ids as written
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import re, unittest
+
+from _v047 import core
+from spiral_core_v047 import _META_SHAPES_MAX, ColumnarHistory, Event, History, IdGenerator
+
+OFF = ["00000000000000AB", "0x00000000000000", "0000_0000_000000", " 00000000000000a"]
+
+class IdGeneratorTest(unittest.TestCase):
+    def test_content_nonces_differ(self):
+        gen = IdGenerator("content"); prev = core.ID_GEN; core.set_id_generator(gen)
+        try:
+            h = History(); loop = core.SimLoop(h, core.Clock(core.VirtualClock(1000)), nonce=gen.nonce)
+            loop.input("x", "evt0")
+            for i in range(1, 60): loop.input("xyzzy"[i % 5], f"evt{i}"); loop.derive()
+        finally:
+            core.set_id_generator(prev)
+        nonces = [re.match(r"NOISE:(\w+):", e.payload).group(1) for e in h.events if e.meta.get("kind") == "noise"]
+        self.assertGreater(len(nonces), 1)
+        self.assertEqual(len(set(nonces)), len(nonces))
+
+    def test_nonce_is_new_outside_content_mode(self):
+        a, b = IdGenerator("keyed"), IdGenerator("keyed")
+        self.assertEqual([a.nonce() for _ in range(3)], [b.new() for _ in range(3)])
+
+    def test_content_meta_cache_is_capped(self):
+        gen = IdGenerator("content")
+        ids = [gen.new(1, (), {"n": i}, "") for i in range(_META_SHAPES_MAX + 10)]
+        self.assertEqual(len(gen._metas), _META_SHAPES_MAX)
+        self.assertEqual(gen.new(1, (), {"n": _META_SHAPES_MAX + 5}, ""), ids[-5])
+        self.assertNotEqual(gen.new(1, (), {"n": 1}, ""), gen.new(1, (), {"n": True}, ""))
+
+class IdKeyTest(unittest.TestCase):
+    def test_non_canonical_ids_are_rejected(self):
+        for eid in OFF:
+            with self.assertRaises(ValueError, msg=eid): ColumnarHistory().add(Event(1, eid, []))
+
+    def test_non_canonical_parents_stay_dangling(self):
+        h = ColumnarHistory(); h.add(Event(1, "00000000000000ab", []))
+        h.add(Event(2, "00000000000000ac", OFF + ["00000000000000ab"]))
+        self.assertEqual(h.events[1].parent_ids, OFF + ["00000000000000ab"])
+        self.assertIsNone(h.index_of("00000000000000AB"))
+        self.assertEqual(h.index_of("00000000000000ab"), 0)
+
+if __name__ == "__main__":
+    unittest.main()
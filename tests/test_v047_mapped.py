@@ -0,0 +1,62 @@
+# test_v047_mapped.py — MappedHistory (segments queried in place) against the History it was written from
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import tempfile, unittest
+
+from _v047 import ids
+from test_v047_segments import rows, sample
+from spiral_core_v047 import Event, History, conflict_heat, frontier, top_positions
+from spiral_segments_v047 import MappedHistory, write_segments
+
+class MappedHistoryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory(); cls.ref = sample(400, seed=13)
+        write_segments(cls.ref, cls.tmp.name, max_bytes=4096, block_events=32)
+        cls.m = MappedHistory(cls.tmp.name, cache_blocks=2)  # small cache: blocks are evicted and re-decoded
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_events(self):
+        m, ref = self.m, self.ref
+        self.assertEqual(len(m), len(ref.events))
+        self.assertEqual(rows(m), rows(ref))
+        self.assertEqual([m.events[i].id for i in (0, -1, 37, 5, 200)], [ref.events[i].id for i in (0, -1, 37, 5, 200)])
+        self.assertEqual(list(m.ts), list(ref.ts)); self.assertEqual(m.ts_sorted, ref.ts_sorted)
+
+    def test_by_id_and_children(self):
+        m, ref = self.m, self.ref
+        for e in ref.events[::-7] + ref.events[-3:]:
+            self.assertEqual(m.by_id[e.id].payload, e.payload, e.id)
+            self.assertEqual(sorted(m.children_of(e.id)), sorted(ref.children_of(e.id)), e.id)
+        for eid in ("deadbeefdeadbeef", "nothex!"):  # EDGE holds positioned parents only, as ColumnarHistory
+            self.assertEqual(list(m.children_of(eid)), [], eid)
+        self.assertNotIn("0000000000000000ff", m.by_id)
+        self.assertIsNone(m.by_id.get("ffffffffffffffff"))
+
+    def test_index_queries(self):
+        m, ref = self.m, self.ref
+        for flt in ({"kind": "input"}, {"kind": "observe"}, {"kind": "noise"}, {"topic": "x"}, {"topic": "ü"},
+                    {"observe": "conflict_heat"}, {"noise_kind": "conflict(2)"}, {"topic": "none"}):
+            self.assertEqual(list(m.positions(**flt)), list(ref.positions(**flt)), flt)
+            self.assertEqual(ids(m.last(5, **flt)), ids(ref.last(5, **flt)), flt)
+        ts = sorted(set(ref.ts))
+        for a, b in [(None, None), (ts[10], ts[40]), (ts[-1], None), (ts[-1] + 1, None)]:
+            self.assertEqual(ids(m.range(a, b)), ids(ref.range(a, b)), (a, b))
+        for t in ts[::13]: self.assertEqual(m.index_at(t), ref.index_at(t), t)
+
+    def test_views(self):
+        m, ref = self.m, self.ref
+        for kw in ({"mode": "global"}, {"mode": "recent"}, {"mode": "recent", "recent_k": 4, "anc_depth": 2}):
+            self.assertEqual(ids(frontier(m, **kw)), ids(frontier(ref, **kw)), kw)
+        self.assertEqual(conflict_heat(m), conflict_heat(ref))
+        self.assertEqual(ids(top_positions(m, m.positions(kind="observe"), 20)),
+                         ids(top_positions(ref, ref.positions(kind="observe"), 20)))
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError): self.m.add(Event(0, "0" * 16, []))
+
+if __name__ == "__main__":
+    unittest.main()
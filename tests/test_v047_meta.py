@@ -0,0 +1,81 @@
+# test_v047_meta.py — metas that differ only in value type (1, 1.0, True, [1], (1,)) survive every store
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import io, json, os, tempfile, unittest
+
+from _v047 import core  # noqa: F401  (import path)
+from spiral_core_v047 import ColumnarHistory, CompactEvent, Event, History
+from spiral_jsonl_v047 import export_jsonl, iter_jsonl
+from spiral_segments_v047 import MappedHistory, load_segments, write_segments
+from spiral_sqlite_v047 import SqliteHistory
+from spiral_wal_v047 import WriteAheadLog
+
+METAS = [{"kind": "input", "n": 1}, {"kind": "input", "n": 1.0}, {"kind": "input", "n": True},
+         {"kind": "input", "n": 0}, {"kind": "input", "n": False}, {"kind": "input", "n": None},
+         {"kind": "input", "n": [1]}, {"kind": "input", "n": [True]}, {"kind": "input", "n": {"a": 1}},
+         {"kind": "input", "n": {"a": 1.0}}, {"kind": "input", "n": 1}, {"kind": "input", "n": True}]
+
+def typed(meta):
+    # meta with every value's JSON spelling, so 1 / 1.0 / true compare unequal
+    return json.dumps(meta, sort_keys=True)
+
+def sample():
+    h = History()
+    for i, m in enumerate(METAS):
+        h.add(Event(1000 + i, f"{i:016x}", [f"{i-1:016x}"] if i else [], dict(m), f"evt{i}"))
+    return h
+
+class CompactMetaTest(unittest.TestCase):
+    def test_interned_metas_keep_value_types(self):
+        evs = [CompactEvent(e.ts, e.id, e.parent_ids, e.meta, e.payload) for e in sample().events]
+        self.assertEqual([typed(e.meta) for e in evs], [typed(m) for m in METAS])
+        self.assertIs(evs[0].meta, evs[10].meta)  # one shared mapping per shape
+
+class JsonlMetaTest(unittest.TestCase):
+    def test_round_trip_keeps_value_types(self):
+        buf = io.StringIO(); export_jsonl(sample(), buf); buf.seek(0)
+        self.assertEqual([typed(e.meta) for e in iter_jsonl(buf)], [typed(m) for m in METAS])
+
+class ColumnarMetaTest(unittest.TestCase):
+    def test_columnar_keeps_value_types(self):
+        h = ColumnarHistory(); h.extend(sample().events)
+        self.assertEqual([typed(e.meta) for e in h.events], [typed(m) for m in METAS])
+
+class SegmentMetaTest(unittest.TestCase):
+    def test_segments_keep_value_types(self):
+        with tempfile.TemporaryDirectory() as d:
+            write_segments(sample(), d)
+            want = [typed(m) for m in METAS]
+            for cls in (History, ColumnarHistory):
+                self.assertEqual([typed(e.meta) for e in load_segments(d, cls).events], want, cls.__name__)
+            self.assertEqual([typed(e.meta) for e in MappedHistory(d).events], want)
+
+class WalMetaTest(unittest.TestCase):
+    def test_wal_keeps_value_types(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = os.path.join(d, "h.wal"); wal = WriteAheadLog(p, fsync=False)
+            for e in sample().events: wal.append(e)
+            wal.close()
+            self.assertEqual([typed(e.meta) for e in WriteAheadLog(p).events()], [typed(m) for m in METAS])
+
+    def test_reopen_then_append(self):
+        # a meta defined twice in the table (here: the writer forgets its codes mid-log) must not make
+        # the code handed out after a reopen collide with an existing table entry
+        metas = [{"kind": "input", "n": 1}, {"kind": "input", "n": 2}, {"kind": "input", "n": 1},
+                 {"kind": "input", "n": 3}]
+        evs = [Event(1000 + i, f"{i:016x}", [], m, f"evt{i}") for i, m in enumerate(metas)]
+        with tempfile.TemporaryDirectory() as d:
+            p = os.path.join(d, "h.wal"); wal = WriteAheadLog(p, fsync=False)
+            wal.append(evs[0]); wal.append(evs[1]); wal.metas.clear(); wal.append(evs[2]); wal.close()
+            wal = WriteAheadLog(p, fsync=False); wal.append(evs[3]); wal.close()
+            got = list(WriteAheadLog(p).events())
+            self.assertEqual([e.id for e in got], [e.id for e in evs])
+            self.assertEqual([e.meta for e in got], metas)
+
+class SqliteMetaTest(unittest.TestCase):
+    def test_sqlite_keeps_value_types(self):
+        h = SqliteHistory(); h.extend(sample().events)
+        self.assertEqual([typed(e.meta) for e in h.events], [typed(m) for m in METAS])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# test_v047_pipeline.py — SpiralPipeline against SimLoop.step: same inputs, clock and ids, same history
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import random, unittest
+
+from _v047 import core
+from spiral_core_v047 import Clock, ColumnarHistory, History, IdGenerator, InvariantMonitor, SimLoop, VirtualClock
+from spiral_pipeline_v047 import SpiralPipeline
+from spiral_replay_v047 import digest
+from spiral_sqlite_v047 import SqliteHistory
+
+def inputs(n, seed=3):
+    rnd = random.Random(seed)
+    return [(rnd.choice("xyz"), f"evt{i}:{rnd.randint(1, 10**7)}", rnd.choice("xyz") if i % 9 == 0 else None)
+            for i in range(n)]
+
+def with_counter_ids(fn):
+    gen = IdGenerator("counter"); prev = core.ID_GEN; core.set_id_generator(gen)
+    try: return fn(gen)
+    finally: core.set_id_generator(prev)
+
+def by_loop(xs, cls=History):
+    def run(gen):
+        h = cls(); loop = SimLoop(h, Clock(VirtualClock(1000)), nonce=gen.nonce); InvariantMonitor(h)
+        for x in xs: loop.step(*x)
+        return h
+    return with_counter_ids(run)
+
+def by_pipeline(xs, cls=History, chunk=1024, split=None, monitor=False):
+    def run(gen):
+        h = cls(); clk = Clock(VirtualClock(1000))
+        if monitor: InvariantMonitor(h)
+        p = SpiralPipeline(h, clk, nonce=gen.nonce, chunk=chunk)
+        if split is None: return h, list(p.push_many(xs))
+        out = list(p.push_many(xs[:split]))
+        p = SpiralPipeline(h, clk, nonce=gen.nonce, chunk=chunk)  # restart: state resumes from h
+        for x in xs[split:]: out += p.push(x)
+        return h, out
+    return with_counter_ids(run)
+
+class PipelineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.xs = inputs(3000); cls.ref = digest(by_loop(cls.xs))
+
+    def test_same_history_as_simloop(self):
+        h, out = by_pipeline(self.xs)
+        self.assertEqual(digest(h), self.ref)
+        self.assertEqual([e.id for e in out], [e.id for e in h.events if e.meta["kind"] != "input"])
+
+    def test_chunk_sizes(self):
+        for chunk in (1, 7, 100):
+            self.assertEqual(digest(by_pipeline(self.xs, chunk=chunk)[0]), self.ref, chunk)
+
+    def test_with_a_monitor(self):
+        self.assertEqual(digest(by_pipeline(self.xs, chunk=64, monitor=True)[0]), self.ref)
+
+    def test_restart(self):
+        for split in (1, 500, 1234):
+            self.assertEqual(digest(by_pipeline(self.xs, chunk=64, split=split)[0]), self.ref, split)
+
+    def test_other_histories(self):
+        xs = self.xs[:800]; ref = digest(by_loop(xs))
+        for cls in (ColumnarHistory, SqliteHistory):
+            self.assertEqual(digest(by_pipeline(xs, cls)[0]), ref, cls.__name__)
+
+if __name__ == "__main__":
+    unittest.main()
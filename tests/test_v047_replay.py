@@ -0,0 +1,34 @@
+# test_v047_replay.py — record_script / replay rebuild the run that produced a history
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import re, unittest
+
+from _v047 import run_loop
+from spiral_core_v047 import Event, History
+from spiral_replay_v047 import record_script, replay
+
+def shape(h):
+    # ts, kind, parent positions and payload per event; ids and noise nonces differ between runs
+    pos = {e.id: i for i, e in enumerate(h.events)}
+    return [(e.ts, e.meta.get("kind"), tuple(pos.get(p) for p in e.parent_ids),
+             re.sub(r"NOISE:\w+:", "NOISE::", e.payload)) for e in h.events]
+
+class ReplayTest(unittest.TestCase):
+    def test_replay_rebuilds_the_run(self):
+        h = run_loop(History(), 60)
+        steps = record_script(h); r = replay(steps)
+        self.assertEqual(shape(r), shape(h))
+        self.assertEqual(record_script(r), steps)
+
+    def test_v046_history_without_repair_marker(self):
+        # v0.046 repairs carried no meta marker: only the payload says "repair: summarize"
+        h = run_loop(History(), 60)
+        old = History()
+        for e in h.events:
+            old.add(Event(e.ts, e.id, e.parent_ids, {k: v for k, v in e.meta.items() if k != "repair"}, e.payload))
+        r = replay(record_script(old))
+        self.assertEqual(len(r.events), len(h.events))
+        self.assertEqual(shape(r), shape(h))
+
+if __name__ == "__main__":
+    unittest.main()
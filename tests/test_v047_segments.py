@@ -0,0 +1,70 @@
+# test_v047_segments.py — segment log round-trips: write_segments / load_segments give the history back
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import os, tempfile, unittest
+
+from _v047 import run_loop
+from spiral_core_v047 import ColumnarHistory, Event, History
+from spiral_segments_v047 import iter_segments, list_segments, load_segments, stored_count, write_segments
+
+def rows(h):
+    return [(e.ts, e.id, list(e.parent_ids), dict(e.meta), e.payload) for e in h.events]
+
+def sample(steps=300, seed=9, odd_ids=True):
+    # a SimLoop run plus what the fixed-width records must escape: dangling parents, utf-8 and (History
+    # only) ids that are not 16 lowercase hex
+    h = run_loop(History(), steps, seed=seed); t = h.ts[-1]; last = h.events[-1].id
+    a, b = ("weird-id", "00000000000000AB") if odd_ids else (f"{12343:016x}", f"{12344:016x}")
+    h.add(Event(t + 1, a, [last, "deadbeefdeadbeef", "nothex!"], {"kind": "input", "topic": "ü"}, "pay ü"))
+    h.add(Event(t + 1, b, [a], {"kind": "observe", "observe": "conflict_heat"}, ""))
+    h.add(Event(t + 2, f"{12345:016x}", [b, h.events[5].id], {"kind": "noise", "n": 3}, "x" * 300))
+    return h
+
+class SegmentRoundTripTest(unittest.TestCase):
+    def test_load_gives_the_history_back(self):
+        for odd in (True, False):
+            h = sample(odd_ids=odd)
+            with tempfile.TemporaryDirectory() as d:
+                self.assertEqual(write_segments(h, d, block_events=64), len(h.events))
+                for cls in (History, ColumnarHistory):
+                    if odd and cls is ColumnarHistory:
+                        with self.assertRaises(ValueError): load_segments(d, cls)
+                        continue
+                    g = load_segments(d, cls)
+                    self.assertEqual(rows(g), rows(h), cls.__name__)
+                    self.assertEqual({k: list(v) for k, v in g.by_meta.items()},
+                                     {k: list(v) for k, v in h.by_meta.items()}, cls.__name__)
+                    self.assertEqual(g.ts_sorted, h.ts_sorted)
+                self.assertEqual(rows(_history(iter_segments(d))), rows(h))
+
+    def test_columnar_source(self):
+        h = ColumnarHistory(); h.extend(e for e in run_loop(History(), 200).events)
+        with tempfile.TemporaryDirectory() as d:
+            write_segments(h, d, block_events=50)
+            self.assertEqual(rows(load_segments(d, ColumnarHistory)), rows(h))
+
+    def test_append_only_rotation(self):
+        h = sample(); n = len(h.events)
+        with tempfile.TemporaryDirectory() as d:
+            self.assertEqual(write_segments(_prefix(h, 100), d, max_bytes=2048, block_events=16), 100)
+            self.assertEqual(write_segments(_prefix(h, 100), d, max_bytes=2048, block_events=16), 0)
+            self.assertEqual(write_segments(h, d, max_bytes=2048, block_events=16), n - 100)
+            self.assertGreater(len(list_segments(d)), 2)
+            self.assertEqual(stored_count(d), n)
+            self.assertEqual(rows(load_segments(d)), rows(h))
+            with self.assertRaises(ValueError): write_segments(_prefix(h, 10), d)
+
+    def test_empty(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "h")
+            self.assertEqual(write_segments(History(), path), 0)
+            self.assertEqual(rows(load_segments(path)), [])
+
+def _history(evs):
+    p = History(); p.extend(evs); return p
+
+def _prefix(h, n):
+    return _history(h.events[:n])
+
+if __name__ == "__main__":
+    unittest.main()
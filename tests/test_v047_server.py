@@ -0,0 +1,40 @@
+# test_v047_server.py — IngestServer: per-line input errors do not reach the writer
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import asyncio, json, unittest
+
+from _v047 import core  # noqa: F401  (import path)
+from spiral_core_v047 import History
+from spiral_server_v047 import IngestServer
+
+async def exchange(srv, lines):
+    r, w = await asyncio.open_connection("127.0.0.1", srv.port)
+    w.write("".join(json.dumps(d) + "\n" for d in lines).encode())
+    replies = [json.loads(await asyncio.wait_for(r.readline(), 10)) for _ in lines]
+    w.close()
+    return replies
+
+class BadInputTest(unittest.TestCase):
+    def test_bad_repair_is_a_line_error(self):
+        async def run():
+            srv = await IngestServer(History()).start(port=0)
+            try:
+                replies = await exchange(srv, [{"topic": "x", "label": "a"},
+                                               {"topic": "y", "label": "b", "repair": [1]},
+                                               {"topic": "y", "label": "c", "repair": {"t": "z"}},
+                                               {"topic": "z", "label": "d", "repair": "x"}])
+                self.assertIsNone(srv.error)
+                self.assertFalse(srv.writer_task.done())
+                more = await exchange(srv, [{"topic": "x", "label": "e"}])
+            finally:
+                await srv.close()
+            return replies, more, srv.h
+        replies, more, h = asyncio.run(run())
+        self.assertIn("n", replies[0]); self.assertIn("error", replies[1]); self.assertIn("error", replies[2])
+        self.assertIn("n", replies[3]); self.assertIn("n", more[0])
+        topics = [e.meta.get("topic") for e in h.events if e.meta.get("kind") == "input"]
+        self.assertEqual(topics, ["x", "z", "x", "x"])  # z's repair topic x, then e
+        self.assertTrue(all(isinstance(t, str) for t in topics))
+
+if __name__ == "__main__":
+    unittest.main()
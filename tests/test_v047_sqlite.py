@@ -0,0 +1,41 @@
+# test_v047_sqlite.py — SqliteHistory against History: frontier, range and index_at
+# Usage: python -m unittest discover -s tests   (or: python -m pytest tests)
+from __future__ import annotations
+import unittest
+
+from _v047 import ids, run_loop
+from spiral_core_v047 import Event, History, frontier
+from spiral_sqlite_v047 import SqliteHistory
+
+class SqliteHistoryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        src = run_loop(History(), 400, seed=5)
+        # coarser timestamps: runs of equal ts, so range/index_at hit ties at their bounds
+        evs = [Event(e.ts // 3, e.id, list(e.parent_ids), dict(e.meta), e.payload) for e in src.events]
+        cls.ref = History(); cls.ref.extend(evs)
+        cls.sql = SqliteHistory(batch=64)
+        for e in evs: cls.sql.add(e)
+        cls.ts = sorted(set(cls.ref.ts))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sql.close()
+
+    def test_frontier(self):
+        for kw in ({"mode": "global"}, {"mode": "recent"}, {"mode": "recent", "recent_k": 4, "anc_depth": 2},
+                   {"mode": "recent", "recent_ms": 5}, {"mode": "global", "topk": 200}):
+            self.assertEqual(ids(frontier(self.sql, **kw)), ids(frontier(self.ref, **kw)), kw)
+
+    def test_index_at(self):
+        for t in [self.ts[0] - 1, self.ts[-1] + 1] + self.ts[::7] + [x + 1 for x in self.ts[::11]]:
+            self.assertEqual(self.sql.index_at(t), self.ref.index_at(t), t)
+
+    def test_range(self):
+        ts = self.ts
+        for a, b in [(None, None), (ts[10], None), (None, ts[20]), (ts[5], ts[5]), (ts[5], ts[6]),
+                     (ts[30], ts[90]), (ts[-1], ts[-1] + 1), (ts[-1] + 1, None)]:
+            self.assertEqual(ids(self.sql.range(a, b)), ids(self.ref.range(a, b)), (a, b))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,11 +23,13 @@ class History:
     def __init__(self) -> None:
         self.events: List[Event] = []
         self.by_id: Dict[str, Event] = {}
+        self.depth: Dict[str, int] = {}  # chain depth, 1 + max(parent depth); missing parent -> 999
 
     def append(self, parent_ids: List[str], payload: str, meta: Optional[Dict[str,str]]=None) -> Event:
         meta = meta or {}
         raw = {"parent_ids": parent_ids, "ts": _ts(), "payload": payload, "meta": meta}
         eid = _hash(raw)
+        self.depth[eid] = max((1 + self.depth[p] if p in self.depth else 999 for p in parent_ids), default=1)
         ev = Event(id=eid, parent_ids=list(parent_ids), ts=raw["ts"], payload=payload, meta=meta)
         self.events.append(ev); self.by_id[eid] = ev
         return ev
@@ -40,14 +42,8 @@ class View:
         return [e for e in h.events if self.predicate(e, h)]
 
 def chain_depth(e: Event, h: History, seen: Set[str]) -> int:
-    if e.id in seen: return 999
-    seen.add(e.id)
-    if not e.parent_ids: return 1
-    ds = []
-    for pid in e.parent_ids:
-        pe = h.by_id.get(pid)
-        ds.append(999 if pe is None else 1 + chain_depth(pe, h, seen.copy()))
-    return max(ds) if ds else 1
+    # O(1): depth is stored per event by History.append (seen kept for call-site compat)
+    return h.depth[e.id]
 
 def trace_score(e: Event, h: History, alpha: float=0.55) -> float:
     # continuous score: missing parents / deep chains reduce score smoothly
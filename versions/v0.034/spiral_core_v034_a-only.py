@@ -1,9 +1,10 @@
 # spiral_core v0.34-a-only (Non-narrative, Non-persona) <200 lines
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Set, Tuple
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
 import hashlib, json, random, time
-from collections import Counter
+from bisect import bisect_left, insort
+from collections import deque
 
 def _hash(obj: dict) -> str:
     b = json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")
@@ -12,6 +13,8 @@ def _hash(obj: dict) -> str:
 def _ts() -> int:
     return int(time.time() * 1000)
 
+KV = Tuple[Tuple[int, int], ...]  # parsed payload: (key code, value code) pairs
+
 @dataclass(frozen=True)
 class Event:
     id: str
@@ -24,14 +27,31 @@ class History:
     def __init__(self) -> None:
         self.events: List[Event] = []
         self.by_id: Dict[str, Event] = {}
+        self.depth: Dict[str, int] = {}  # chain depth, 1 + max(parent depth); missing parent -> 999
+        self.windows: Dict[int, ConflictWindow] = {}  # conflict_heat state per win
+        self.inputs: List[Event] = []  # kind == "input", append order
+        self.vocab: Dict[str, int] = {}  # interned payload keys/values -> code
+        self.words: List[str] = []  # code -> string
+        self.kv: Dict[str, KV] = {}  # input id -> parse_kv(payload) as code pairs, parsed once on append
+        self._shapes: Dict[KV, KV] = {}  # identical kv tuples shared across events
 
     def append(self, parent_ids: List[str], payload: str, meta: Optional[Dict[str,str]]=None) -> Event:
         meta = meta or {}
         raw = {"parent_ids": parent_ids, "ts": _ts(), "payload": payload, "meta": meta}
         eid = _hash(raw)
+        self.depth[eid] = max((1 + self.depth[p] if p in self.depth else 999 for p in parent_ids), default=1)
         ev = Event(id=eid, parent_ids=list(parent_ids), ts=raw["ts"], payload=payload, meta=meta)
         self.events.append(ev); self.by_id[eid] = ev
+        if meta.get("kind") == "input":
+            self.inputs.append(ev); self.kv[eid] = self._intern_kv(payload)
         return ev
+    def code(self, s: str) -> int:
+        c = self.vocab.get(s)
+        if c is None: c = self.vocab[s] = len(self.words); self.words.append(s)
+        return c
+    def _intern_kv(self, payload: str) -> KV:
+        kv = tuple((self.code(k), self.code(v)) for k, v in parse_kv(payload).items())
+        return self._shapes.setdefault(kv, kv)
 
 class View:
     def __init__(self, name: str, predicate: Callable[[Event, History], bool]) -> None:
@@ -40,14 +60,8 @@ class View:
         return [e for e in h.events if self.predicate(e, h)]
 
 def chain_depth(e: Event, h: History, seen: Set[str]) -> int:
-    if e.id in seen: return 999
-    seen.add(e.id)
-    if not e.parent_ids: return 1
-    ds = []
-    for pid in e.parent_ids:
-        pe = h.by_id.get(pid)
-        ds.append(999 if pe is None else 1 + chain_depth(pe, h, seen.copy()))
-    return max(ds) if ds else 1
+    # O(1): depth is stored per event by History.append (seen kept for call-site compat)
+    return h.depth[e.id]
 
 def trace_score(e: Event, h: History, alpha: float=0.55) -> float:
     miss = sum(1 for pid in e.parent_ids if pid not in h.by_id)
@@ -64,26 +78,74 @@ def parse_kv(payload: str) -> Dict[str,str]:
             if k and v: out[k] = v
     return out
 
+class ConflictWindow:
+    # conflict_heat(h, win) state, kept on h and advanced by the events appended since the last call.
+    # Per key: value -> deque of occurrence seqs over the inputs among the last win events
+    # (distinct values -> heat; count, then first occurrence -> dominant, same pick as most_common).
+    # Keys/values are h.vocab codes read from h.kv (no payload parsing here); strings only in rows.
+    # Rows stay sorted by (-heat, key) in a bisect-maintained list.
+    def __init__(self, h: History, win: int) -> None:
+        self.h, self.win, self.seen, self.total = h, win, 0, 0
+        self.ring: Deque[Tuple[Event, Optional[KV]]] = deque()
+        self.vals: Dict[int, Dict[int, Deque[int]]] = {}
+        self.row: Dict[int, Tuple[int,str,int]] = {}
+        self.order: List[Tuple[int,str,int]] = []
+        self.rows: List[Tuple[str,int,str,int]] = []
+        self.dirty: Set[int] = set()
+
+    def _push(self, e: Event, seq: int) -> None:
+        if len(self.ring) == self.win: self._evict()
+        kv = self.h.kv.get(e.id)  # None for non-inputs
+        self.ring.append((e, kv))
+        for k, v in kv or ():
+            self.vals.setdefault(k, {}).setdefault(v, deque()).append(seq)
+            self.dirty.add(k)
+
+    def _evict(self) -> None:
+        _, kv = self.ring.popleft()
+        for k, v in kv or ():
+            vs = self.vals[k]; vs[v].popleft()
+            if not vs[v]: del vs[v]
+            if not vs: del self.vals[k]
+            self.dirty.add(k)
+
+    def _refresh(self) -> None:
+        words = self.h.words
+        for k in self.dirty:
+            old = self.row.pop(k, None)
+            if old is not None:
+                del self.order[bisect_left(self.order, (-old[0], words[k]))]
+                self.total -= old[0]
+            vs = self.vals.get(k)
+            if not vs: continue
+            heat = max(0, len(vs)-1)
+            dom_v, occ = max(vs.items(), key=lambda it: (len(it[1]), -it[1][0]))
+            self.row[k] = (heat, words[dom_v], len(occ))
+            insort(self.order, (-heat, words[k], k))
+            self.total += heat
+        self.dirty.clear()
+        self.rows = [(ks,) + self.row[k] for _, ks, k in self.order]
+
+    def sync(self) -> Tuple[int, List[Tuple[str,int,str,int]]]:
+        h = self.h; n = len(h.events)
+        if n - self.seen > self.win:
+            while self.ring: self._evict()
+            self.seen = n - self.win
+        for i in range(self.seen, n): self._push(h.events[i], i)
+        self.seen = n
+        if self.dirty: self._refresh()
+        return self.total, self.rows
+
+    def inputs(self) -> List[Tuple[Event, KV]]:
+        # (event, kv codes) for the inputs in the window, oldest first
+        return [(e, kv) for e, kv in self.ring if kv is not None]
+
 def conflict_heat(h: History, win: int) -> Tuple[int, List[Tuple[str,int,str,int]]]:
-    recent_inputs = [e for e in h.events[-win:] if e.meta.get("kind") == "input"]
-    key_vals: Dict[str, Set[str]] = {}
-    key_counts: Dict[str, Counter] = {}
-    for e in recent_inputs:
-        kv = parse_kv(e.payload)
-        for k, v in kv.items():
-            key_vals.setdefault(k, set()).add(v)
-            key_counts.setdefault(k, Counter())[v] += 1
-    rows: List[Tuple[str,int,str,int]] = []
-    total = 0
-    for k, vals in key_vals.items():
-        heat = max(0, len(vals)-1)
-        total += heat
-        dom_v, dom_c = ("", 0)
-        if k in key_counts and key_counts[k]:
-            dom_v, dom_c = key_counts[k].most_common(1)[0]
-        rows.append((k, heat, dom_v, dom_c))
-    rows.sort(key=lambda x: (-x[1], x[0]))
-    return total, rows
+    # incremental: one ConflictWindow per (h, win), shared by every caller within a step
+    w = h.windows.get(win)
+    if w is None: w = h.windows[win] = ConflictWindow(h, win)
+    total, rows = w.sync()
+    return total, list(rows)
 
 def observe_conflict_heat(h: History, win: int, topn: int=3) -> Optional[Event]:
     total, rows = conflict_heat(h, win)
@@ -110,16 +172,10 @@ class NoiseEngineAOnly:
         return total
 
     def conflicting_inputs(self, h: History) -> List[Event]:
-        recent_inputs = [e for e in h.events[-self.win:] if e.meta.get("kind") == "input"]
         total, rows = conflict_heat(h, self.win)
         if total <= 0: return []
-        conflict_keys = {k for (k, heat, _, _) in rows if heat >= 1}
-        out: List[Event] = []
-        for e in recent_inputs:
-            kv = parse_kv(e.payload)
-            if any(k in conflict_keys for k in kv.keys()):
-                out.append(e)
-        return out
+        conflict_keys = {h.vocab[k] for (k, heat, _, _) in rows if heat >= 1}
+        return [e for e, kv in h.windows[self.win].inputs() if any(k in conflict_keys for k, _ in kv)]
 
     def should_noise(self, h: History) -> Tuple[bool, str]:
         # Priority: conflict -> (depth only if no conflict) -> count
@@ -132,7 +188,7 @@ class NoiseEngineAOnly:
         return False, ""
 
     def emit_noise(self, h: History, reason: str) -> Event:
-        all_inputs = [e for e in h.events if e.meta.get("kind") == "input"]
+        all_inputs = h.inputs
         pool = self.conflicting_inputs(h) if reason.startswith("conflict") else []
         if len(pool) < 2: pool = all_inputs
         if len(pool) < 2:
@@ -149,10 +205,9 @@ class NoiseEngineAOnly:
         if not h.events: return []
         if random.random() > self.backref_prob:
             return [h.events[-1].id]
-        inputs = [e for e in h.events if e.meta.get("kind") == "input"]
+        inputs = h.inputs
         if len(inputs) < 3: return [h.events[-1].id]
-        older = inputs[:-1]
-        pick = random.choice(older[max(0, len(older)-12):])
+        pick = random.choice(inputs[max(0, len(inputs)-13):-1])  # last 12 before the newest
         return [pick.id]
 
 def accept(h: History, eng: NoiseEngineAOnly, payload: str) -> Event:
@@ -161,7 +216,7 @@ def accept(h: History, eng: NoiseEngineAOnly, payload: str) -> Event:
 
 def frontier_select(h: History, last_inputs: int=3, anc_depth: int=4, topk: int=20) -> List[Event]:
     # Frontier anchors: last N inputs + their input-ancestors; include observe if directly attached; include local noise
-    inputs = [e for e in reversed(h.events) if e.meta.get("kind") == "input"][:last_inputs]
+    inputs = h.inputs[-last_inputs:][::-1] if last_inputs > 0 else []
     keep_in: Set[str] = set()
 
     def walk_in(eid: str, depth: int) -> None:
@@ -0,0 +1,50 @@
+# spiral_audit_v047.py  (parallel parents=conflict_pair audit for large histories)
+# Splits the log into position chunks and audits them in a ProcessPoolExecutor. Each chunk starts from the
+# "last conflict_heat observe" state at its left boundary, so chunks are independent; errors are merged in
+# history order and are byte-identical to spiral_core_v047.invariant_conflict_parents.
+import multiprocessing as mp
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from spiral_core_v047 import _LastObs, _audit_range, _invariant_failed, invariant_conflict_parents
+
+_H=None  # history shared with forked workers (inherited copy-on-write, never pickled)
+
+def boundary(h,lo):
+    # _LastObs as of position lo: the last conflict_heat observe before lo and the last one with an older ts
+    op=h.positions(kind="observe")
+    i=bisect_left(op,lo)-1; found=[]  # newest first
+    while i>=0 and len(found)<2:
+        e=h._at(op[i]); i-=1
+        if e.meta.get("observe")!="conflict_heat": continue
+        if not found or e.ts!=found[0].ts: found.append(e)
+    last=_LastObs()
+    for e in reversed(found): last.push(e)
+    return last
+
+def _chunk(bounds):
+    lo,hi=bounds
+    return _audit_range(_H,lo,hi,boundary(_H,lo))
+
+def audit_parallel(h,workers=None,chunk=None):
+    """invariant_conflict_parents(h) across worker processes: same AssertionError, same text.
+
+    Chunks of `chunk` positions (default: 4 per worker) each return (OBS errors, NOISE errors);
+    all OBS errors are reported before all NOISE errors, chunk by chunk, as in the serial audit.
+    Workers inherit h through fork. Without fork, with one worker, or with out-of-order ts (the
+    strong bind then depends on the whole log), it runs the serial audit."""
+    global _H
+    n=len(h.events); workers=workers or os.cpu_count() or 1
+    if workers<2 or not h.ts_sorted or "fork" not in mp.get_all_start_methods():
+        return invariant_conflict_parents(h)
+    chunk=chunk or max(1,-(-n//(4*workers)))
+    bounds=[(lo,min(n,lo+chunk)) for lo in range(0,n,chunk)]
+    _H=h
+    try:
+        with ProcessPoolExecutor(workers,mp_context=mp.get_context("fork")) as ex:
+            parts=list(ex.map(_chunk,bounds))
+    finally:
+        _H=None
+    errs=[x for obs,_ in parts for x in obs]+[x for _,noise in parts for x in noise]
+    if errs: raise _invariant_failed(errs)
@@ -0,0 +1,902 @@
+# spiral_core_v047.py  (v0.46 model + scale-out storage/indexes)
+import sys, time, random, hashlib, math, heapq, gc, struct, json
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from itertools import count, islice
+from operator import gt
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Set
+try: import numpy as np  # optional: vectorized trace_scores
+except ImportError: np=None
+
+def now_ms(): return int(time.time()*1000)
+def h16(s): return hashlib.sha1(s.encode()).hexdigest()[:16]
+def rnd_id(): return h16(str(random.random())+str(now_ms()))
+
+@contextmanager
+def gc_paused():
+    # cyclic gc off for a bulk build of acyclic objects (load, extend, pipeline chunks): its passes find
+    # nothing to free. Process-wide, so it is the caller's call; the library never switches it off itself.
+    paused=gc.isenabled(); gc.disable()
+    try: yield
+    finally:
+        if paused: gc.enable()
+
+_M64=(1<<64)-1; _Q=struct.Struct("<Q"); _QH=struct.Struct("<qH")
+
+class IdGenerator:
+    """Pluggable event ids. Every mode yields 16 hex digits (64 bits): e.id[:8] printing, _id_key and
+    ColumnarHistory's int ids work unchanged.
+
+    random   rnd_id(): sha1 over random() and the wall clock (the v0.46 behaviour, the default)
+    counter  start, start+1, ... with no hashing and no clock, hex of the little-endian u64: the low
+             byte comes first, so e.id[:8] tells neighbours apart (put a node or run number in the high
+             bits of start)
+    keyed    blake2b(digest_size=8, key=key) over the packed counter: replayable from (key, start),
+             spread uniformly, no order leaked
+    content  blake2b(digest_size=8) over packed (ts, parents, meta, payload): equal events get equal ids
+
+    new(ts, parent_ids, meta, payload) returns the next id; only content mode reads the arguments.
+    nonce() is a fresh value per call for noise payloads: new() in the first three modes, the counter
+    (as in counter mode) in content mode, where new() with no event would repeat."""
+    MODES=("random","counter","keyed","content")
+    def __init__(self,mode="random",start=0,key=b"spiral"):
+        if mode not in self.MODES: raise ValueError(f"unknown id mode {mode!r}, expected one of {self.MODES}")
+        self.mode=mode; self.key=key; self._n=count(start)
+        self._kh=hashlib.blake2b(digest_size=8,key=key)  # keyed state, copied per id (cheaper than re-keying)
+        self._metas={}  # content mode: packed meta per meta shape, up to _META_SHAPES_MAX shapes
+        self.new={"random":self._random,"counter":self._counter,"keyed":self._keyed,"content":self._content}[mode]
+        self.nonce=self._counter if mode=="content" else self.new
+    def __call__(self,ts=0,parent_ids=(),meta=None,payload=""): return self.new(ts,parent_ids,meta,payload)
+    def _random(self,*_): return rnd_id()
+    def _counter(self,*_): return _Q.pack(next(self._n)&_M64).hex()
+    def _keyed(self,*_):
+        x=self._kh.copy(); x.update(_Q.pack(next(self._n)&_M64))
+        return x.hexdigest()
+    def _content(self,ts=0,parent_ids=(),meta=None,payload=""):
+        # fields are delimited; meta items in key order, so dict order does not change the id
+        meta=meta or {}
+        mk=meta_key(meta.items()); mb=self._metas.get(mk)
+        if mb is None:
+            mb="\0".join(f"{k}={v}" for k,v in sorted(meta.items())).encode()
+            if len(self._metas)<_META_SHAPES_MAX: self._metas[mk]=mb
+        b=b"".join((_QH.pack(ts,len(parent_ids)),"\0".join(parent_ids).encode(),b"\1",mb,b"\1",payload.encode()))
+        return hashlib.blake2b(b,digest_size=8).hexdigest()
+
+ID_GEN=IdGenerator()  # ids for mk_input / mk_repair / mk_noise / mk_observe
+def set_id_generator(gen):
+    global ID_GEN
+    ID_GEN=gen
+
+def monotonic_ms():
+    # ms source on time.monotonic_ns(), anchored to the wall clock once: wall-like values that never step back
+    anchor=time.time_ns()//1_000_000-time.monotonic_ns()//1_000_000
+    mono=time.monotonic_ns
+    return lambda: anchor+mono()//1_000_000
+
+class VirtualClock:
+    # injectable ms source for deterministic runs and replay: time moves only through advance()
+    def __init__(self, t=0): self.t = t
+    def __call__(self): return self.t
+    def advance(self, ms=1): self.t += ms
+
+class Clock:
+    """Event timestamps in ms, strictly increasing: t(e_i) < t(e_j) for i < j (step >= 1).
+
+    source  ms callable read for "now": now_ms (default: wall clock, as in v0.46), monotonic_ms(),
+            or a VirtualClock
+    block   ticks per source read. 1 reads on every tick. With n > 1, a read reserves the next n ticks
+            and the following n-1 are handed out without touching the clock. Nothing re-reads the
+            source inside a block, so the lag is bounded in ticks, not in time: n-1 ticks spread over
+            a minute stamp a minute behind. Use it for bulk bursts only; live loops keep block=1.
+    reserve(n) hands out n timestamps for a bulk append with one read."""
+    def __init__(self, source=None, block=1):
+        self.source = source or now_ms; self.block = max(1, block); self.left = 0
+        self.t = self.source()
+    def tick(self, step=1):
+        if self.left:
+            self.left -= 1; self.t += step
+            return self.t
+        cur = self.source()
+        self.t = max(self.t + step, cur); self.left = self.block - 1
+        return self.t
+    def reserve(self, n, step=1):
+        # range of n timestamps, each > every earlier one; the next tick() continues after the last
+        first = max(self.t + step, self.source())
+        self.t = first + (n - 1) * step; self.left = 0
+        return range(first, self.t + 1, step)
+
+def meta_key(items):
+    # hashable key per meta shape, for the caches that encode or intern a meta once. Values are keyed with
+    # their type, since 1 == 1.0 == True would merge {"n":1}, {"n":1.0} and {"n":true}; a value that is
+    # not a str/int/float/bool/None (list, dict, tuple) is keyed by its JSON text.
+    k=[]
+    for f,v in items:
+        t=type(v)
+        k.append((f,t,v) if t is str or t is int or t is float or t is bool or v is None
+                 else (f,t,json.dumps(v,ensure_ascii=False,default=repr)))
+    return tuple(k)
+
+@dataclass
+class Event:
+    ts:int; id:str; parent_ids:List[str]
+    meta:Dict[str,Any]=field(default_factory=dict)
+    payload:str=""
+
+class FrozenMeta(dict):
+    # read-only dict: shared between events, so it must not change. Still a dict for json, dict(m), m.get
+    __slots__=()
+    def _ro(self,*_a,**_k): raise TypeError("event meta is frozen (copy it with dict(meta))")
+    __setitem__=__delitem__=__ior__=clear=pop=popitem=setdefault=update=_ro
+    def __hash__(self): return hash(tuple(self.items()))
+    def __reduce__(self): return (FrozenMeta,(dict(self),))
+
+_META_SHAPES={}; _META_SHAPES_MAX=4096  # interned meta per shape; past the cap new shapes are frozen, not kept
+
+def intern_meta(meta,_get=_META_SHAPES.get):
+    # the shared FrozenMeta for meta's items (in order); one object per distinct meta shape
+    if type(meta) is FrozenMeta: return meta
+    if meta is None: meta={}
+    k=meta_key(meta.items()); m=_get(k)
+    if m is None:
+        m=FrozenMeta(meta)
+        if len(_META_SHAPES)<_META_SHAPES_MAX: _META_SHAPES[k]=m
+    return m
+
+class _EventSlots:
+    __slots__=("ts","id","parent_ids","meta","payload")
+_set_ts,_set_id,_set_par,_set_meta,_set_pay=(_EventSlots.__dict__[f].__set__ for f in _EventSlots.__slots__)
+
+class CompactEvent(_EventSlots):
+    """Slotted, immutable Event: same fields and attribute access, no per-instance __dict__.
+
+    parent_ids is a tuple; meta is interned through intern_meta, so events of one meta shape (input/topic,
+    observe/conflict_heat, noise/conflict(2)) share a single frozen mapping."""
+    __slots__=()
+    def __init__(self,ts,id,parent_ids,meta=None,payload=""):
+        _set_ts(self,ts); _set_id(self,id); _set_par(self,tuple(parent_ids))
+        _set_meta(self,intern_meta(meta)); _set_pay(self,payload)
+    def __setattr__(self,k,v): raise AttributeError(f"CompactEvent is immutable: cannot set {k!r}")
+    __delattr__=__setattr__
+    def _fields(self): return (self.ts,self.id,self.parent_ids,self.meta,self.payload)
+    def __eq__(self,o): return self._fields()==o._fields() if type(o) is CompactEvent else NotImplemented
+    def __hash__(self): return hash(self._fields())
+    def __reduce__(self): return (CompactEvent,self._fields())
+    def __repr__(self):
+        return (f"CompactEvent(ts={self.ts!r}, id={self.id!r}, parent_ids={self.parent_ids!r}, "
+                f"meta={dict(self.meta)!r}, payload={self.payload!r})")
+
+EVENT=Event  # event class built by mk_event (and main); Event or CompactEvent
+def set_event_class(cls):
+    global EVENT
+    EVENT=cls
+
+# meta fields with append-maintained position lists: h.positions(kind="input"), h.last(14, topic="x"), ...
+INDEXED_META=("kind","topic","observe","noise_kind")
+
+def _one_filter(flt):
+    if len(flt)!=1: raise TypeError(f"expected exactly one of {INDEXED_META}, got {sorted(flt)}")
+    (f,v),=flt.items()
+    if f not in INDEXED_META: raise TypeError(f"meta field not indexed: {f!r}")
+    return f,v
+
+class _HistoryQueries:
+    # shared query API over the append-maintained indexes; subclasses provide by_meta, ts, ts_sorted, _at(i)
+    def positions(self,**flt): return self.by_meta.get(_one_filter(flt),())
+    def last(self,n=1,**flt):
+        # last n matching events, oldest->newest; O(n)
+        pos=self.positions(**flt)
+        return [self._at(i) for i in pos[max(0,len(pos)-n):]] if n>0 else []
+    def select(self,**flt): return [self._at(i) for i in self.positions(**flt)]
+    def extend(self,events):
+        # add() each event of an iterable (History overrides this with a batched path)
+        for e in events: self.add(e)
+
+    def _check_ts(self,e):
+        # call before mutating: keeps the ts column sorted, or marks it unusable for bisect
+        if self.ts and e.ts<self.ts[-1]:
+            if self.strict_ts: raise ValueError(f"out-of-order ts: id={e.id[:8]} ts={e.ts} < last ts={self.ts[-1]}")
+            self.ts_sorted=False
+    def index_at(self,ts):
+        # first position whose ts >= ts; O(log n)
+        if not self.ts_sorted: raise ValueError("ts index unusable: history has out-of-order timestamps (use strict_ts=True)")
+        return bisect_left(self.ts,ts)
+    def range(self,ts_from=None,ts_to=None):
+        # events with ts_from <= ts < ts_to (None = open end); O(log n + k)
+        if not self.ts_sorted:
+            return [e for e in self.events if (ts_from is None or e.ts>=ts_from) and (ts_to is None or e.ts<ts_to)]
+        lo=0 if ts_from is None else bisect_left(self.ts,ts_from)
+        hi=len(self.ts) if ts_to is None else bisect_left(self.ts,ts_to,lo)
+        return self.events[lo:hi]
+
+    def save_segments(self,path,**kw):
+        # append the events not yet in path as binary segment files (format: spiral_segments_v047)
+        from spiral_segments_v047 import write_segments
+        return write_segments(self,path,**kw)
+    @classmethod
+    def load_segments(cls,path):
+        from spiral_segments_v047 import load_segments
+        return load_segments(path,cls)
+
+@dataclass
+class History(_HistoryQueries):
+    events:List[Event]=field(default_factory=list)
+    by_id:Dict[str,Event]=field(default_factory=dict)
+    children:Dict[str,List[str]]=field(default_factory=dict)  # reverse edges, kept on append
+    by_meta:Dict[Any,List[int]]=field(default_factory=dict)   # (field, value) -> positions
+    ts:array=field(default_factory=lambda: array('q'))       # ts column for bisect
+    strict_ts:bool=False                                       # reject ts < last ts at append
+    ts_sorted:bool=True
+    listeners:List[Any]=field(default_factory=list,repr=False)  # called as fn(e) after each add
+    def subscribe(self,fn): self.listeners.append(fn)
+    def add(self,e):
+        self._check_ts(e)
+        i=len(self.events); m=e.meta
+        keys=[(f,m[f]) for f in INDEXED_META if m.get(f) is not None]
+        hash(tuple(keys))  # an unhashable value raises here, before the event is half-indexed
+        self.events.append(e); self.ts.append(e.ts); self.by_id[e.id]=e
+        for pid in e.parent_ids: self.children.setdefault(pid,[]).append(e.id)
+        for k in keys: self.by_meta.setdefault(k,[]).append(i)
+        for fn in self.listeners: fn(e)
+    def extend(self,events,batch=4096):
+        # bulk add() from any iterable (e.g. spiral_jsonl_v047.iter_jsonl): same indexes, built a batch at a
+        # time. With listeners it is add() per event, so each listener sees the history as of its event.
+        if self.listeners:
+            for e in events: self.add(e)
+            return
+        it=iter(events); ch=self.children; bm=self.by_meta
+        while True:
+            evs=list(islice(it,batch))
+            if not evs: break
+            ts=array('q',[e.ts for e in evs])
+            if (self.ts and ts[0]<self.ts[-1]) or any(map(gt,ts,islice(ts,1,None))):
+                if self.strict_ts:
+                    for e in evs: self.add(e)  # raises at the first out-of-order event, as add() would
+                    continue
+                self.ts_sorted=False
+            i0=len(self.events); new={}  # batch's meta index first: an unhashable value raises before any change
+            for f in INDEXED_META:
+                for i,e in enumerate(evs,i0):
+                    v=e.meta.get(f)
+                    if v is not None: new.setdefault((f,v),[]).append(i)
+            self.events.extend(evs); self.ts.extend(ts); self.by_id.update((e.id,e) for e in evs)
+            for e in evs:
+                for pid in e.parent_ids: ch.setdefault(pid,[]).append(e.id)
+            for k,pos in new.items():
+                col=bm.get(k)
+                if col is None: bm[k]=pos
+                else: col.extend(pos)
+    def children_of(self,eid): return self.children.get(eid,())
+    def _at(self,i): return self.events[i]
+
+# ---- columnar store: same add/events/by_id surface, no per-event objects ----
+
+class _Interner:
+    # append-only value <-> dense int
+    __slots__=("codes","values")
+    def __init__(self): self.codes={}; self.values=[]
+    def code(self,v,key=None):
+        # key: the dict key when v itself is not the right one (unhashable, or equal to other values)
+        k=v if key is None else key
+        c=self.codes.get(k)
+        if c is None:
+            c=self.codes[k]=len(self.values); self.values.append(v)
+        return c
+    def code_meta(self,items):
+        # meta item tuples, keyed by meta_key: {"n":1} and {"n":True} get different codes, order kept
+        return self.code(items,meta_key(items))
+
+def _id_key(eid):
+    # 16 lowercase hex id -> 64-bit int; None for anything that would not round-trip through f"{k:016x}"
+    # ("0x..", uppercase, "_" separators), which then keeps its string form
+    if len(eid)!=16: return None
+    try: k=int(eid,16)
+    except ValueError: return None
+    return k if f"{k:016x}"==eid else None
+
+class _EventColumn(Sequence):
+    # read-only list view over ColumnarHistory; Events are built on access
+    __slots__=("_h",)
+    def __init__(self,h): self._h=h
+    def __len__(self): return len(self._h.ts)
+    def __getitem__(self,i):
+        n=len(self._h.ts)
+        if isinstance(i,slice): return [self._h.event(j) for j in range(*i.indices(n))]
+        if i<0: i+=n
+        if not 0<=i<n: raise IndexError("event index out of range")
+        return self._h.event(i)
+    def __iter__(self):
+        ev=self._h.event
+        for i in range(len(self._h.ts)): yield ev(i)
+    def __reversed__(self):
+        ev=self._h.event
+        for i in range(len(self._h.ts)-1,-1,-1): yield ev(i)
+
+class _IdIndex(Mapping):
+    # read-only dict view: hex id -> Event
+    __slots__=("_h",)
+    def __init__(self,h): self._h=h
+    def __getitem__(self,eid):
+        i=self._h.index_of(eid)
+        if i is None: raise KeyError(eid)
+        return self._h.event(i)
+    def get(self,eid,default=None):
+        i=self._h.index_of(eid)
+        return default if i is None else self._h.event(i)
+    def __contains__(self,eid): return self._h.index_of(eid) is not None
+    def __len__(self): return len(self._h.pos)
+    def __iter__(self):
+        h=self._h
+        for i in sorted(h.pos.values()): yield h.id_at(i)
+
+class ColumnarHistory(_HistoryQueries):
+    """Drop-in History for long runs: ids interned to dense ints (= append position),
+    ts/kind/topic/meta in array columns, parents as CSR offsets, payloads in one
+    utf-8 blob. `events`/`by_id` are views; Event objects are built on access.
+    Ids must be 16-hex (rnd_id); parents are expected to be appended before children,
+    unknown parent ids are kept verbatim in a small dangling table."""
+    def __init__(self,strict_ts=False):
+        self.strict_ts=strict_ts; self.ts_sorted=True
+        self.ts=array('q'); self.uid=array('Q')
+        self.kind=array('H'); self.topic=array('i'); self.meta_code=array('I')
+        self.par_off=array('q',[0]); self.par_idx=array('q')   # idx<0 -> ~dangling code
+        self.pay_off=array('q',[0]); self.pay=bytearray()
+        self.child_head=array('q'); self.child_next=array('q'); self.child_pos=array('q')  # reverse edges
+        self.pos={}                                             # int(id,16) -> position
+        self.by_meta={}                                         # (field, value) -> array of positions
+        self.listeners=[]                                       # called as fn(e) after each add
+        self.kinds=_Interner(); self.topics=_Interner(); self.metas=_Interner(); self.dangling=_Interner()
+        self.events=_EventColumn(self); self.by_id=_IdIndex(self)
+
+    def add(self,e):
+        k=_id_key(e.id)
+        if k is None: raise ValueError(f"ColumnarHistory needs 16-hex ids, got {e.id!r}")
+        self._check_ts(e)
+        i=len(self.ts); m=e.meta
+        # codes and index keys before any column grows: an unhashable value raises with nothing appended
+        kc=self.kinds.code(m.get("kind")); t=m.get("topic"); tc=-1 if t is None else self.topics.code(t)
+        mc=self.metas.code_meta(tuple(m.items()))
+        keys=[(f,m[f]) for f in INDEXED_META if m.get(f) is not None]
+        hash(tuple(keys))
+        for pid in e.parent_ids:
+            pk=_id_key(pid); j=self.pos.get(pk) if pk is not None else None
+            if j is None: self.par_idx.append(~self.dangling.code(pid)); continue
+            self.par_idx.append(j)
+            self.child_next.append(self.child_head[j]); self.child_head[j]=len(self.child_pos); self.child_pos.append(i)
+        self.par_off.append(len(self.par_idx))
+        self.ts.append(e.ts); self.uid.append(k)
+        self.kind.append(kc); self.topic.append(tc); self.meta_code.append(mc)
+        self.pay+=e.payload.encode(); self.pay_off.append(len(self.pay))
+        self.child_head.append(-1)
+        for key in keys:
+            col=self.by_meta.get(key)
+            if col is None: col=self.by_meta[key]=array('q')
+            col.append(i)
+        self.pos[k]=i
+        for fn in self.listeners: fn(e)
+
+    def subscribe(self,fn): self.listeners.append(fn)
+
+    def __len__(self): return len(self.ts)
+    def id_at(self,i): return f"{self.uid[i]:016x}"
+    def index_of(self,eid):
+        k=_id_key(eid)
+        return None if k is None else self.pos.get(k)
+    def parent_idx(self,i): return self.par_idx[self.par_off[i]:self.par_off[i+1]]
+    def child_idx(self,i):
+        out=[]; x=self.child_head[i]
+        while x>=0: out.append(self.child_pos[x]); x=self.child_next[x]
+        return out
+    def children_of(self,eid):
+        i=self.index_of(eid)
+        return () if i is None else [self.id_at(j) for j in self.child_idx(i)]
+    def _at(self,i): return self.event(i)
+    def event(self,i):
+        pids=[self.id_at(j) if j>=0 else self.dangling.values[~j] for j in self.parent_idx(i)]
+        return Event(self.ts[i],self.id_at(i),pids,dict(self.metas.values[self.meta_code[i]]),
+                     self.pay[self.pay_off[i]:self.pay_off[i+1]].decode())
+
+def fmt_score(x): return f"{x:.3e}" if x < 1e-2 else f"{x:.3f}"
+def last_id(h): return h.events[-1].id if h.events else None
+
+def trace_score(e,h,half_life_ms=450):
+    age = max(0, h.events[-1].ts - e.ts)
+    return math.exp(-age/max(1,half_life_ms))
+
+def trace_scores(h,items,half_life_ms=450):
+    # batch trace_score over positions, ids or Events -> float64 ndarray (array('d') without numpy)
+    ts=[h.by_id[x].ts if isinstance(x,str) else (x.ts if isinstance(x,(Event,CompactEvent)) else h.ts[x]) for x in items]
+    if not ts: return np.zeros(0) if np is not None else array('d')
+    last=h.ts[-1]; hl=max(1,half_life_ms)
+    if np is not None:
+        return np.exp(-np.maximum(0,last-np.asarray(ts,dtype=np.int64))/hl)
+    exp=math.exp
+    return array('d',[exp(-max(0,last-t)/hl) for t in ts])
+
+def mk_event(ts,parents,meta,payload):
+    return EVENT(ts,ID_GEN.new(ts,parents,meta,payload),parents,meta,payload)
+
+def mk_input(clk,h,topic,label):
+    ts=clk.tick(); pid=last_id(h)
+    return mk_event(ts,[pid] if pid else [],{"kind":"input","topic":topic},f"{label}; topic={topic}")
+
+def mk_repair(clk,h,topic):
+    ts=clk.tick(); pid=last_id(h)
+    return mk_event(ts,[pid] if pid else [],{"kind":"input","topic":topic,"repair":True},f"repair: summarize; topic={topic}")
+
+def mk_noise(clk,parents,payload):
+    ts=clk.tick()
+    return mk_event(ts,parents,{"kind":"noise","noise_kind":"conflict(2)"},payload)
+
+def mk_observe(clk,parents,payload):
+    ts=clk.tick()
+    return mk_event(ts,parents,{"kind":"observe","observe":"conflict_heat"},payload)
+
+def conflict_heat(h,win=14):
+    tail=h.last(win,kind="input")
+    topics=[e.meta.get("topic","?") for e in tail]
+    heat=sum(1 for i in range(1,len(topics)) if topics[i]!=topics[i-1])
+    counts={}
+    for t in topics: counts[t]=counts.get(t,0)+1
+    dom=max(counts.items(), key=lambda kv: kv[1])[0] if counts else "?"
+    domc=counts.get(dom,0)
+    
+    # pair_ids: 绑定"冲突"的两条输入（默认取 dominant topic 的最后两条）
+    dom_tail=[e.id for e in tail if e.meta.get("topic","?")==dom]
+    pair_ids=dom_tail[-2:]
+    
+    # 保底：不足 2 个就用窗口内最近 input 补齐（去重）
+    if len(pair_ids)<2:
+        for e in reversed(tail):
+            if e.id not in pair_ids:
+                pair_ids.append(e.id)
+            if len(pair_ids)==2:
+                break
+    
+    # 统一顺序：旧->新（因为上面可能 append）
+    if len(pair_ids)==2 and pair_ids[0]==tail[-1].id:
+        pair_ids=pair_ids[::-1]
+    
+    return heat, ("topic",heat,dom,domc), pair_ids
+
+class ConflictHeatTracker:
+    """conflict_heat(h, win) kept current as inputs are appended; value() is bit-identical, O(1) amortized.
+
+    ring     last win inputs as (id, topic); heat is the running count of adjacent topic switches
+    occ[t]   deque of (seq, id) for topic t in the window: count, first occurrence, last two ids
+    dominant max count, ties -> earliest first occurrence (what max() over the insertion-ordered
+             counts dict picks); one min-heap of (first_seq, topic) per count, pruned lazily"""
+    def __init__(self,h=None,win=14):
+        if win<1: raise ValueError("win must be >= 1")
+        self.win=win; self.ring=deque(); self.heat=0; self.seq=0
+        self.occ={}; self.buckets={}; self.live={}; self.maxc=0
+        if h is not None:
+            for e in h.last(win,kind="input"): self.push(e)
+            h.subscribe(self.on_add)
+
+    def on_add(self,e):
+        if e.meta.get("kind")=="input": self.push(e)
+
+    def _enter(self,t,c):
+        # topic t now has count c
+        self.live[c]=self.live.get(c,0)+1
+        hp=self.buckets.setdefault(c,[])
+        heapq.heappush(hp,(self.occ[t][0][0],t))
+        if len(hp)>2*self.live[c]+8:
+            hp[:]=[(fs,x) for fs,x in hp if x in self.occ and len(self.occ[x])==c and self.occ[x][0][0]==fs]
+            heapq.heapify(hp)
+
+    def _evict(self):
+        _,t=self.ring.popleft()
+        if self.ring and self.ring[0][1]!=t: self.heat-=1
+        d=self.occ[t]; c=len(d); self.live[c]-=1
+        d.popleft()
+        if d: self._enter(t,c-1)
+        else: del self.occ[t]
+        if not self.live.get(self.maxc): self.maxc-=1
+
+    def push(self,e):
+        t=e.meta.get("topic","?")
+        if len(self.ring)==self.win: self._evict()
+        if self.ring and self.ring[-1][1]!=t: self.heat+=1
+        self.ring.append((e.id,t))
+        d=self.occ.get(t)
+        if d is None: d=self.occ[t]=deque()
+        c=len(d)
+        if c: self.live[c]-=1
+        d.append((self.seq,e.id)); self.seq+=1
+        self._enter(t,c+1)
+        if c+1>self.maxc: self.maxc=c+1
+
+    def _dominant(self):
+        c=self.maxc; hp=self.buckets[c]
+        while True:
+            fs,t=hp[0]; d=self.occ.get(t)
+            if d is not None and len(d)==c and d[0][0]==fs: return t
+            heapq.heappop(hp)
+
+    def value(self):
+        # same (heat, top, pair_ids) as conflict_heat(h, win)
+        if not self.ring: return 0, ("topic",0,"?",0), []
+        dom=self._dominant(); d=self.occ[dom]; domc=len(d)
+        if domc>=2: pair_ids=[d[-2][1],d[-1][1]]
+        else:
+            # fallback as in conflict_heat: backfill with the newest other input, keep old->new
+            pair_ids=[d[-1][1]]; newest=self.ring[-1][0]
+            if newest!=pair_ids[0]: pair_ids.append(newest)
+            elif len(self.ring)>=2: pair_ids=[self.ring[-2][0],pair_ids[0]]
+        return self.heat, ("topic",self.heat,dom,domc), pair_ids
+
+def sig_no_dom(win,total_heat,top):
+    key,heat,dom,_=top
+    return f"win={win};total_heat={total_heat};top={key}:{heat}:{dom}"
+
+def resume_state(h):
+    # main()'s derived loop state as of h's last event, recovered from the log itself (e.g. after a WAL
+    # replay): (last_obs_sig, last_obs_parents, last_conflict_ts)
+    obs=h.last(1,observe="conflict_heat"); noise=h.last(1,noise_kind="conflict(2)")
+    sig=parents=None
+    if obs:
+        kv=dict(x.split("=",1) for x in obs[0].payload.split("; ")[1:])
+        sig=sig_no_dom(kv["win"],kv["total_heat"],tuple(kv["top"].rsplit(":",3)))
+        parents=list(obs[0].parent_ids)
+    return sig,parents,(noise[0].ts if noise else -10**18)
+
+# ---- parents=conflict_pair: per-event checks shared by InvariantMonitor and the audit ----
+# error strings are parsed by downstream tooling: keep them byte-stable
+
+def _pair_error(by_id,e,label):
+    # first pair violation of an OBS/NOISE event, or None
+    p=e.parent_ids
+    if len(p)!=2: return f"{label} parents len != 2: id={e.id[:8]} p={len(p)}"
+    a,b=p[0],p[1]
+    ea,eb=by_id.get(a),by_id.get(b)
+    if ea is None or eb is None:
+        miss=a if ea is None else b
+        return f"{label} parent missing: id={e.id[:8]} parent={miss[:8]}"
+    if ea.meta.get("kind")!="input" or eb.meta.get("kind")!="input":
+        ka=ea.meta.get("kind","?"); kb=eb.meta.get("kind","?")
+        return f"{label} parents not both input: id={e.id[:8]} a={a[:8]}({ka}) b={b[:8]}({kb})"
+    if a==b: return f"{label} parents duplicated: id={e.id[:8]} a=b={a[:8]}"
+    # 可选：顺序约束（旧->新）
+    if ea.ts>eb.ts: return f"{label} parents order not old->new: id={e.id[:8]} a_ts>b_ts a={a[:8]} b={b[:8]}"
+    return None
+
+def _bind_error(e,prev_obs):
+    # strong bind: noise.parents must equal the most recent conflict_heat observe.parents before it
+    if prev_obs is None or tuple(e.parent_ids)==tuple(prev_obs.parent_ids): return None
+    return (f"STRONG_BIND mismatch: noise={e.id[:8]} "
+            f"parents=[{','.join(i[:8] for i in e.parent_ids)}] "
+            f"!= prev_obs={prev_obs.id[:8]} parents=[{','.join(i[:8] for i in prev_obs.parent_ids)}]")
+
+def _invariant_failed(errs):
+    return AssertionError("Invariant failed: parents=conflict_pair\n- " + "\n- ".join(errs))
+
+class _LastObs:
+    # "most recent conflict_heat observe with ts < t" over observes fed in ts order:
+    # the newest one, plus the newest one with an older ts (for noise sharing the newest observe's ts)
+    __slots__=("cur","lt")
+    def __init__(self): self.cur=self.lt=None
+    def push(self,x):
+        if self.cur is None or x.ts!=self.cur.ts: self.lt=self.cur
+        self.cur=x
+    def before(self,ts): return self.cur if self.cur is not None and self.cur.ts<ts else self.lt
+
+class InvariantMonitor:
+    """parents=conflict_pair checked on every h.add, O(1) per event.
+
+    OBS/NOISE events: exactly two parents, both present and kind=input, distinct, old->new by ts;
+    NOISE parents must equal those of the last conflict_heat observe (the strong bind).
+    Parents are looked up in h.by_id at append time, so a parent added later counts as missing.
+    fail_fast=True raises AssertionError on the first violation (the event stays appended);
+    fail_fast=False only collects, in append order, and check() raises them together."""
+    def __init__(self,h=None,fail_fast=True):
+        self.fail_fast=fail_fast; self.errors=[]; self.by_id={}; self.obs=_LastObs()
+        if h is not None: self.attach(h)
+
+    def attach(self,h):
+        # checks the events already in h, then follows h.add
+        self.by_id=h.by_id
+        for e in h.events: self.on_add(e)
+        h.subscribe(self.on_add)
+
+    def _report(self,err):
+        if err is None: return
+        self.errors.append(err)
+        if self.fail_fast: raise _invariant_failed([err])
+
+    def on_add(self,e):
+        m=e.meta; k=m.get("kind")
+        if k=="observe" and m.get("observe")=="conflict_heat":
+            self._report(_pair_error(self.by_id,e,"OBS"))
+            self.obs.push(e)
+        elif k=="noise" and m.get("noise_kind")=="conflict(2)":
+            self._report(_pair_error(self.by_id,e,"NOISE"))
+            self._report(_bind_error(e,self.obs.before(e.ts)))
+
+    def check(self):
+        if self.errors: raise _invariant_failed(self.errors)
+
+def _audit_range(h,lo,hi,last):
+    # (OBS errors, NOISE errors) for positions lo..hi-1 of a ts-sorted h, each in history order;
+    # last is the _LastObs as of position lo and is advanced in place
+    by_id=h.by_id; obs_errs=[]; noise_errs=[]
+    op,npos=h.positions(kind="observe"),h.positions(kind="noise")
+    oi,oe=bisect_left(op,lo),bisect_left(op,hi)
+    def observes_before(end):
+        nonlocal oi
+        while oi<oe and op[oi]<end:
+            e=h._at(op[oi]); oi+=1
+            if e.meta.get("observe")!="conflict_heat": continue
+            err=_pair_error(by_id,e,"OBS")
+            if err: obs_errs.append(err)
+            last.push(e)
+    for ni in range(bisect_left(npos,lo),bisect_left(npos,hi)):
+        observes_before(npos[ni])
+        e=h._at(npos[ni])
+        if e.meta.get("noise_kind")!="conflict(2)": continue
+        err=_pair_error(by_id,e,"NOISE")
+        if err: noise_errs.append(err)
+        err=_bind_error(e,last.before(e.ts))
+        if err: noise_errs.append(err)
+    observes_before(hi)
+    return obs_errs,noise_errs
+
+def invariant_conflict_parents(h):
+    # audit of a whole history, O(#observe + #noise) via the kind index; OBS errors first, then NOISE
+    # (spiral_audit_v047.audit_parallel splits the same walk across processes)
+    if h.ts_sorted:
+        obs_errs,noise_errs=_audit_range(h,0,len(h.events),_LastObs())
+    else:
+        # unsorted ts: bind to the newest observe anywhere in the log with an older ts
+        by_id=h.by_id; obs_errs=[]; noise_errs=[]; obs=[]
+        for i in h.positions(kind="observe"):
+            e=h._at(i)
+            if e.meta.get("observe")!="conflict_heat": continue
+            obs.append(e)
+            err=_pair_error(by_id,e,"OBS")
+            if err: obs_errs.append(err)
+        for e in h.select(kind="noise"):
+            if e.meta.get("noise_kind")!="conflict(2)": continue
+            err=_pair_error(by_id,e,"NOISE")
+            if err: noise_errs.append(err)
+            err=_bind_error(e,next((x for x in reversed(obs) if x.ts<e.ts),None))
+            if err: noise_errs.append(err)
+    if obs_errs or noise_errs: raise _invariant_failed(obs_errs+noise_errs)
+
+def closure(h, seed_ids, anc_depth) -> Set[str]:
+    # ancestors within anc_depth hops of any seed (min distance, so the result is order independent)
+    native=getattr(h,"ancestors",None)
+    if native is not None: return native(seed_ids,anc_depth)  # e.g. SqliteHistory: one recursive CTE
+    keep={i for i in seed_ids if i and i in h.by_id}
+    level=list(keep)
+    for _ in range(anc_depth):
+        nxt=[]
+        for eid in level:
+            for pid in h.by_id[eid].parent_ids:
+                if pid not in keep and pid in h.by_id: keep.add(pid); nxt.append(pid)
+        if not nxt: break
+        level=nxt
+    return keep
+
+def rank_key(e):
+    # view order is (trace_score, ts) desc per SPEC 6.2, id breaking exact ties. trace_score is
+    # monotone in ts, so (ts, id) gives the same order without computing a single exp().
+    return (e.ts, e.id)
+
+def top_events(evs, n):
+    # bounded top-n in view order, O(m log n)
+    return heapq.nlargest(n, evs, key=rank_key) if n>0 else []
+
+def top_positions(h, pos, n):
+    # top-n of an index position list (e.g. h.positions(kind="observe")); with a sorted ts
+    # column only the tail is read: the last n positions plus any earlier ts ties at the boundary
+    if n<=0 or not pos: return []
+    if not h.ts_sorted: return top_events((h._at(i) for i in pos), n)
+    lo=max(0,len(pos)-n)
+    while lo>0 and h.ts[pos[lo-1]]==h.ts[pos[lo]]: lo-=1
+    return top_events([h._at(i) for i in pos[lo:]], n)
+
+def frontier(h, mode="global",
+             last_inputs=4, last_observes=2,
+             anc_depth=6, topk=20,
+             recent_k=12, recent_ms=None):
+    # recent_ms: seed "recent" with the events of the last recent_ms ms (ts index) instead of the last recent_k
+    # roots = last N inputs + last M observes (oldest->newest within each)
+    roots=h.last(last_observes,kind="observe")+h.last(last_inputs,kind="input")
+    if not roots: return []
+
+    if mode=="recent":
+        tail=h.range(h.events[-1].ts-recent_ms) if recent_ms is not None else h.events[-recent_k:]
+        tail_ids={e.id for e in tail}
+        root_ids={r.id for r in roots}
+        seed = tail_ids | root_ids
+        keep_ids = closure(h,seed,anc_depth)
+        # also keep children of keep_ids (forward, via the reverse-edge index) so linked noise/observe stays visible.
+        # a kept child's own children are kept too, same as the old in-order scan over h.events.
+        stack=list(keep_ids)
+        while stack:
+            for cid in h.children_of(stack.pop()):
+                if cid not in keep_ids: keep_ids.add(cid); stack.append(cid)
+        evs=[h.by_id[i] for i in keep_ids if i in h.by_id]
+    else:
+        # global: build skeleton from roots, then keep edges that touch skeleton
+        skel=closure(h,{r.id for r in roots},anc_depth)
+        keep=set(skel)
+        for eid in skel: keep.update(h.children_of(eid))
+        evs=[h.by_id[i] for i in keep if i in h.by_id]
+
+    return top_events(evs, topk)
+
+class RecentAFrontier:
+    """Live frontier(h, mode="recent", ...) kept current on every h.add.
+
+    A  = ancestors (<= anc_depth) of Seed = last recent_k events + roots; anc_ref[v] counts the
+         seeds whose bounded ancestry holds v (ancestry never changes in an append-only DAG).
+    keep = A + everything downstream of A; sup[v] = [v in A] + #parents of v in keep.
+    Each append adds/expires seeds and cascades only where counts cross zero."""
+    def __init__(self,h,last_inputs=4,last_observes=2,anc_depth=6,recent_k=12):
+        self.h=h; self.last_inputs=last_inputs; self.last_observes=last_observes
+        self.anc_depth=anc_depth; self.recent_k=recent_k
+        self.seed=set(); self._anc={}   # seed id -> its bounded ancestry
+        self.anc_ref={}; self.sup={}; self.keep=set()
+        self._reseed()
+        h.subscribe(self.on_add)
+
+    def _seed_now(self):
+        h=self.h
+        roots=h.last(self.last_observes,kind="observe")+h.last(self.last_inputs,kind="input")
+        return {e.id for e in h.events[-self.recent_k:]}|{r.id for r in roots} if roots else set()
+
+    def _inc(self,v):
+        self.sup[v]=self.sup.get(v,0)+1
+        if self.sup[v]!=1: return
+        stack=[v]
+        while stack:
+            x=stack.pop(); self.keep.add(x)
+            for c in self.h.children_of(x):
+                n=self.sup.get(c,0)+1; self.sup[c]=n
+                if n==1: stack.append(c)
+
+    def _dec(self,v):
+        self.sup[v]-=1
+        if self.sup[v]: return
+        stack=[v]
+        while stack:
+            x=stack.pop(); self.keep.discard(x); del self.sup[x]
+            for c in self.h.children_of(x):
+                self.sup[c]-=1
+                if not self.sup[c]: stack.append(c)
+
+    def _reseed(self):
+        new=self._seed_now()
+        for s in new-self.seed:
+            anc=self._anc[s]=closure(self.h,(s,),self.anc_depth)
+            for v in anc:
+                self.anc_ref[v]=self.anc_ref.get(v,0)+1
+                if self.anc_ref[v]==1: self._inc(v)
+        for s in self.seed-new:
+            for v in self._anc.pop(s):
+                self.anc_ref[v]-=1
+                if not self.anc_ref[v]: del self.anc_ref[v]; self._dec(v)
+        self.seed=new
+
+    def on_add(self,e):
+        n=sum(1 for pid in e.parent_ids if pid in self.keep)
+        if n: self.sup[e.id]=n; self.keep.add(e.id)
+        self._reseed()
+
+    def view(self,topk=20):
+        h=self.h
+        return top_events([h.by_id[i] for i in self.keep], topk)
+
+def print_view(title, rows, h, n=20):
+    print(f"\n== View: {title} ==")
+    rows=rows[:n]
+    for e,sc in zip(rows,trace_scores(h,rows)):
+        k=e.meta.get("kind"); p=len(e.parent_ids)
+        tag=f" [{e.meta.get('noise_kind','noise')}]" if k=="noise" else ""
+        parents_str=""
+        if p:
+            parents_str=" parents=["+",".join(x[:8] for x in e.parent_ids)+"]"
+        print(f"{e.ts} {e.id} {k} score={fmt_score(sc)} p={p}{parents_str}{tag} | {e.payload[:92]}{'…' if len(e.payload)>92 else ''}")
+
+class SimLoop:
+    """main()'s observe/noise decision loop over a history, one script step at a time.
+
+    step(topic, label, repair) = input(topic, label), repair(repair) if given, derive(). derive() appends an
+    observe when the conflict_heat signature changes and a conflict(2) noise when heat >= 2 and the
+    cooldown has passed.
+    State resumes from h (resume_state), so a loop can pick up a replayed WAL. nonce() fills the noise
+    payload id: rnd_id (default) or a deterministic generator for replay."""
+    def __init__(self,h,clk,win=14,cooldown_ms=2,nonce=rnd_id):
+        self.h=h; self.clk=clk; self.win=win; self.cooldown_ms=cooldown_ms; self.nonce=nonce
+        # strong bind: noise must reuse last observe parents; all three carry over a WAL restart
+        self.last_obs_sig,self.last_obs_parents,self.last_conflict_ts=resume_state(h)
+        self.heat_tr=ConflictHeatTracker(h,win)  # incremental conflict_heat(h,win)
+        self.topic=self.label=None
+
+    def input(self,topic,label):
+        self.topic=topic; self.label=label
+        self.h.add(mk_input(self.clk,self.h,topic,label))
+    def repair(self,topic):
+        self.h.add(mk_repair(self.clk,self.h,topic))
+
+    def derive(self):
+        # observe / noise decisions after the latest inputs; label and topic of the newest input go in the noise payload
+        h=self.h; clk=self.clk
+        heat, top, pair_ids = self.heat_tr.value()
+        key,_heat,dom,domc=top
+        sig=sig_no_dom(self.win,heat,top)
+
+        if sig!=self.last_obs_sig:
+            h.add(mk_observe(clk,pair_ids,f"observe=conflict_heat; win={self.win}; total_heat={heat}; top={key}:{heat}:{dom}:{domc}"))
+            self.last_obs_sig=sig
+            self.last_obs_parents=list(pair_ids)  # cache
+
+        if heat>=2 and (h.events[-1].ts-self.last_conflict_ts)>=self.cooldown_ms:
+            use_parents=self.last_obs_parents if self.last_obs_parents else list(pair_ids)
+            h.add(mk_noise(clk,use_parents,f"NOISE:{self.nonce()}:conflict(2):top={key}:{heat}:{dom}:{domc}:{self.label}; topic={self.topic}"))
+            self.last_conflict_ts=h.events[-1].ts
+
+    def step(self,topic,label,repair=None):
+        # one main() iteration: input, optional repair input, derive
+        self.input(topic,label)
+        if repair is not None: self.repair(repair)
+        self.derive()
+
+def main(history_cls=History,wal_path=None,clock=None):
+    random.seed(7)
+    clk=clock or Clock(); h=history_cls(); wal=None
+    try:
+        if wal_path:
+            # durable mode: replay what an earlier run committed, then log every add (spiral_wal_v047)
+            from spiral_wal_v047 import WriteAheadLog
+            wal=WriteAheadLog(wal_path); wal.replay(h)
+            if h.events:
+                print(f"WAL: replayed {len(h.events)} events from {wal_path}")
+                clk.t=max(clk.t,h.events[-1].ts)  # new events after the replayed ones, even within the same ms
+        TOPICS=["x","y","z"]
+        gen=ID_GEN  # evt0 ids and noise nonces come from the selected generator too (random: rnd_id, as in v0.46)
+        loop=SimLoop(h,clk,win=14,cooldown_ms=2,nonce=gen.nonce)
+        InvariantMonitor(h)  # fail-fast: a derived event breaking parents=conflict_pair raises at h.add
+        if wal is not None: wal.attach(h)
+
+        if not h.events:  # a replayed WAL already has its parentless first input
+            t0=random.choice(TOPICS); ts=clk.tick(); m={"kind":"input","topic":t0}
+            eid=gen.new() if gen.mode=="random" else None  # v0.46 draw order: the id's random() before the label's
+            pay=f"evt0:{random.randint(1_000_000,9_999_999)}; topic={t0}"
+            h.add(EVENT(ts,eid or gen.new(ts,[],m,pay),[],m,pay))
+
+        for i in range(1,28):
+            t=random.choice(TOPICS); lab=f"evt{i}:{random.randint(1_000_000,9_999_999)}"
+            loop.input(t,lab)
+            if i%9==0: loop.repair(random.choice(TOPICS))
+            loop.derive()
+
+        print(f"\nHistory size: {len(h.events)} (append-only)")
+        print_view("LAST_12", h.events[-12:][::-1], h, n=12)
+        fr_recent = frontier(h, mode="recent", topk=20, recent_k=10)
+        fr_global = frontier(h, mode="global", topk=20)
+        print_view("FRONTIER_RECENT_K_FIXED top20 (ranked by trace_score)", fr_recent, h, n=20)
+        print_view("FRONTIER_GLOBAL top20 (ranked by trace_score)", fr_global, h, n=20)
+
+        obs=top_positions(h, h.positions(kind="observe"), 20)
+        print_view("OBSERVE_ONLY (ranked by trace_score)", obs, h, n=20)
+        print("\nInvariant: no deletions, no edits. Only new events.")
+    finally:
+        if wal is not None: wal.close()  # commit what was logged, also when the run raises
+    return h
+
+if __name__=="__main__":
+    sys.modules.setdefault("spiral_core_v047",sys.modules[__name__])  # helper modules share these classes and globals
+    args=sys.argv[1:]
+    if "--ids" in args[:-1]: set_id_generator(IdGenerator(args[args.index("--ids")+1]))
+    if "--compact" in args: set_event_class(CompactEvent)
+    clocks={"wall":Clock,"monotonic":lambda: Clock(monotonic_ms()),"virtual":lambda: Clock(VirtualClock(1_700_000_000_000))}
+    main(ColumnarHistory if "--columnar" in args else History,
+         args[args.index("--wal")+1] if "--wal" in args[:-1] else None,
+         clocks[args[args.index("--clock")+1]]() if "--clock" in args[:-1] else None)
@@ -0,0 +1,101 @@
+# spiral_graph_v047.py  (optional NumPy engine for frontier membership)
+# Exports the history DAG as CSR arrays (node = append position) and runs the RECENT_A closure as
+# vectorized frontier expansion over boolean masks. Same id sets as frontier(mode="recent"|"global").
+# Requires numpy; spiral_core_v047 itself does not.
+import numpy as np
+
+from spiral_core_v047 import ColumnarHistory, top_events
+
+def _gather(off, idx, nodes):
+    # concatenated idx[off[v]:off[v+1]] for v in nodes (ragged gather, no Python loop)
+    s = off[nodes]; ln = off[nodes + 1] - s
+    tot = int(ln.sum())
+    if not tot: return idx[:0]
+    base = np.repeat(s - (np.cumsum(ln) - ln), ln)
+    return idx[base + np.arange(tot)]
+
+class CSRGraph:
+    """Snapshot of h as parent/child CSR arrays; rebuild (from_history) after appends.
+
+    par_idx[par_off[i]:par_off[i+1]] are the parent positions of event i (dangling parents dropped),
+    ch_idx[ch_off[i]:ch_off[i+1]] its children."""
+    def __init__(self, par_off, par_idx, ts):
+        n = len(par_off) - 1
+        self.n, self.par_off, self.par_idx, self.ts = n, par_off, par_idx, ts
+        child = np.repeat(np.arange(n, dtype=np.int64), np.diff(par_off))
+        order = np.argsort(par_idx, kind="stable")
+        self.ch_idx = child[order]
+        self.ch_off = np.concatenate(([0], np.cumsum(np.bincount(par_idx, minlength=n)))).astype(np.int64)
+
+    @classmethod
+    def from_history(cls, h):
+        if isinstance(h, ColumnarHistory):
+            # columns are array('q'): np.array copies (a view would pin them against appends)
+            off = np.array(h.par_off, dtype=np.int64)
+            idx = np.array(h.par_idx, dtype=np.int64)
+            if (idx < 0).any():
+                n = len(off) - 1
+                ok = idx >= 0
+                owner = np.repeat(np.arange(n, dtype=np.int64), np.diff(off))
+                off = np.concatenate(([0], np.cumsum(np.bincount(owner[ok], minlength=n)))).astype(np.int64)
+                idx = idx[ok]
+            return cls(off, idx, np.array(h.ts, dtype=np.int64))
+        pos = {e.id: i for i, e in enumerate(h.events)}
+        off = [0]; idx = []
+        for e in h.events:
+            idx.extend(pos[p] for p in e.parent_ids if p in pos)
+            off.append(len(idx))
+        return cls(np.asarray(off, dtype=np.int64), np.asarray(idx, dtype=np.int64),
+                   np.array(h.ts, dtype=np.int64))
+
+    def closure(self, seed, anc_depth):
+        # mask of ancestors within anc_depth hops of seed positions (level-synchronous BFS)
+        mask = np.zeros(self.n, dtype=bool)
+        level = np.unique(np.asarray(seed, dtype=np.int64))
+        mask[level] = True
+        for _ in range(anc_depth):
+            p = _gather(self.par_off, self.par_idx, level)
+            p = np.unique(p[~mask[p]])
+            if not p.size: break
+            mask[p] = True; level = p
+        return mask
+
+    def forward(self, mask, transitive=False):
+        # keep + children of kept nodes (one masked gather); transitive repeats until no new nodes
+        out = mask.copy()
+        level = np.flatnonzero(mask)
+        while level.size:
+            c = _gather(self.ch_off, self.ch_idx, level)
+            c = np.unique(c[~out[c]])
+            out[c] = True
+            if not transitive: break
+            level = c
+        return out
+
+def frontier_mask(h, g=None, mode="global", last_inputs=4, last_observes=2,
+                  anc_depth=6, recent_k=12, recent_ms=None):
+    # same membership rules as spiral_core_v047.frontier, as a boolean mask over positions
+    g = g or CSRGraph.from_history(h)
+    po, pi = h.positions(kind="observe"), h.positions(kind="input")
+    roots = list(po[max(0, len(po) - last_observes):]) + list(pi[max(0, len(pi) - last_inputs):])
+    if not roots: return np.zeros(g.n, dtype=bool)
+    if mode == "recent":
+        lo = h.index_at(h.ts[-1] - recent_ms) if recent_ms is not None else max(0, g.n - recent_k)
+        seed = np.concatenate((np.arange(lo, g.n, dtype=np.int64), np.asarray(roots, dtype=np.int64)))
+        return g.forward(g.closure(seed, anc_depth), transitive=True)
+    return g.forward(g.closure(roots, anc_depth))
+
+def frontier_ids(h, g=None, **kw):
+    return {h.id_at(i) if isinstance(h, ColumnarHistory) else h.events[i].id
+            for i in np.flatnonzero(frontier_mask(h, g, **kw))}
+
+def frontier(h, g=None, topk=20, **kw):
+    # drop-in for spiral_core_v047.frontier: only the ts-boundary candidates become Event objects
+    g = g or CSRGraph.from_history(h)
+    kept = np.flatnonzero(frontier_mask(h, g, **kw))
+    if topk <= 0 or not kept.size: return []
+    if kept.size > topk:
+        ts = g.ts[kept]
+        thr = np.partition(ts, kept.size - topk)[kept.size - topk]
+        kept = kept[ts >= thr]
+    return top_events([h._at(int(i)) for i in kept], topk)
@@ -0,0 +1,42 @@
+# spiral_jsonl_v047.py  (streaming JSONL export / import)
+# One event per line, keys in Event field order; meta and parent_ids keep their order:
+#   {"ts":1700000000000,"id":"4f1c...","parent_ids":["a0b1...",...],"meta":{"kind":"input","topic":"x"},"payload":"..."}
+# Both directions stream: export writes a buffer of lines at a time, import yields one Event per line, so
+# memory stays flat apart from the History being filled (h.extend(iter_jsonl(fp))).
+import io
+import json
+
+from spiral_core_v047 import Event, meta_key
+
+_enc=json.JSONEncoder(ensure_ascii=False,separators=(",",":")).encode
+_dec=json.JSONDecoder().decode
+
+def export_jsonl(h,fp,since_index=0,buffer_events=4096):
+    """Write h.events[since_index:] to fp (text or binary) as JSONL; returns the number written.
+
+    since_index lets a caller append only the events added since its last export."""
+    n=len(h.events); binary=isinstance(fp,(io.RawIOBase,io.BufferedIOBase))
+    metas={}  # encoded meta per distinct meta shape
+    buf=[]; enc=_enc
+    for i in range(since_index,n):
+        e=h._at(i)
+        mk=meta_key(e.meta.items()); m=metas.get(mk)
+        if m is None: m=metas[mk]=enc(e.meta)
+        buf.append(f'{{"ts":{enc(e.ts)},"id":{enc(e.id)},"parent_ids":{enc(e.parent_ids)},"meta":{m},"payload":{enc(e.payload)}}}\n')
+        if len(buf)>=buffer_events:
+            s="".join(buf); fp.write(s.encode() if binary else s); buf.clear()
+    if buf:
+        s="".join(buf); fp.write(s.encode() if binary else s)
+    return max(0,n-since_index)
+
+def iter_jsonl(fp):
+    # Events from a JSONL file object (text or binary), one line at a time; blank lines are skipped
+    name=getattr(fp,"name","<jsonl>")
+    for ln,line in enumerate(fp,1):
+        if isinstance(line,bytes): line=line.decode()
+        if not line.strip(): continue
+        try:
+            d=_dec(line); e=Event(d["ts"],d["id"],d["parent_ids"],d["meta"],d["payload"])
+        except (ValueError,KeyError,TypeError) as x:
+            raise ValueError(f"{name}:{ln}: bad event record: {x!r}") from None
+        yield e
@@ -0,0 +1,84 @@
+# spiral_pipeline_v047.py  (streaming ingestion: main()'s observe/noise rules as a reusable pipeline)
+# Stages, per input chunk:
+#   build    input (+ repair) events, chained to the previous event, ts from the Clock
+#   signal   ConflictHeatTracker.push -> (heat, top, pair_ids), O(1) amortized
+#   gate     observe when the conflict_heat signature changes; conflict(2) noise when heat >= 2 and the
+#            cooldown since the last noise has passed (parents = last observe's, the strong bind)
+#   append   one h.extend for the chunk's inputs and derived events, in order
+# Then the chunk's derived events are yielded. The rules and payloads are those of SimLoop.derive, so
+# feeding the same inputs with the same clock and ids gives the same history.
+from itertools import islice
+
+import spiral_core_v047 as core
+from spiral_core_v047 import Clock, ConflictHeatTracker, resume_state, rnd_id
+
+class SpiralPipeline:
+    """Ingest inputs into h and derive observe/noise events; push_many yields the derived events.
+
+        p=SpiralPipeline(h)
+        for e in p.push_many(("x", f"evt{i}") for i in range(n)): ...
+
+    An input is (topic, label) or (topic, label, repair_topic). A repair input follows its input before
+    the gate runs, as in main(). State resumes from h (resume_state and its last win inputs), and the clock
+    is moved past h's last ts. h is then appended only through the pipeline: its tracker is fed by the
+    pipeline, not subscribed to h.
+    chunk inputs go to h in one extend(); a History without listeners takes the batched path. An
+    InvariantMonitor on h still checks every event, at per-add speed."""
+    def __init__(self,h,clk=None,win=14,cooldown_ms=2,nonce=rnd_id,chunk=1024):
+        self.h=h; self.clk=clk or Clock(); self.win=win; self.cooldown_ms=cooldown_ms
+        self.nonce=nonce; self.chunk=chunk
+        self.last_obs_sig,self.last_obs_parents,self.last_conflict_ts=resume_state(h)
+        self.heat_tr=ConflictHeatTracker(None,win)
+        for e in h.last(win,kind="input"): self.heat_tr.push(e)
+        last=h.events[-1] if len(h.events) else None
+        self.last_id=last.id if last is not None else None
+        if last is not None: self.clk.t=max(self.clk.t,last.ts)  # new events after h's, even in the same ms
+        self.inputs=0; self.derived=0
+
+    def push(self,x):
+        # one input; returns the derived events it appended
+        return list(self.push_many((x,)))
+
+    def push_many(self,inputs):
+        # generator: consumes inputs a chunk at a time and yields each chunk's derived events once appended
+        it=iter(inputs)
+        while True:
+            xs=list(islice(it,self.chunk))
+            if not xs: return
+            evs,derived=self._run(xs)
+            self.h.extend(evs)
+            self.inputs+=len(xs); self.derived+=len(derived)
+            yield from derived
+
+    def _run(self,xs):
+        # build + signal + gate for one chunk; nothing touches h until the caller extends it
+        tick=self.clk.tick; tr=self.heat_tr; push=tr.push; win=self.win; cool=self.cooldown_ms; nonce=self.nonce
+        E=core.EVENT; new=core.ID_GEN.new  # as mk_event, read once per chunk
+        sig0=self.last_obs_sig; obs_p=self.last_obs_parents; conf_ts=self.last_conflict_ts; prev=self.last_id
+        key0=None  # (heat, dom) of sig0 once the pipeline has built it: equal key = equal signature
+        OBS={"kind":"observe","observe":"conflict_heat"}; NOISE={"kind":"noise","noise_kind":"conflict(2)"}
+        evs=[]; derived=[]; add=evs.append
+        for x in xs:
+            topic=x[0]; label=x[1]
+            ts=tick(); p=[prev] if prev else []; m={"kind":"input","topic":topic}; pay=f"{label}; topic={topic}"
+            e=E(ts,new(ts,p,m,pay),p,m,pay); add(e); push(e); prev=e.id
+            if len(x)>2 and x[2] is not None:
+                r=x[2]; ts=tick(); p=[prev]; m={"kind":"input","topic":r,"repair":True}; pay=f"repair: summarize; topic={r}"
+                e=E(ts,new(ts,p,m,pay),p,m,pay); add(e); push(e); prev=e.id
+            heat,top,pair_ids=tr.value()
+            _key,_heat,dom,domc=top
+            last_ts=e.ts
+            if (heat,dom)!=key0:
+                sig=f"win={win};total_heat={heat};top=topic:{heat}:{dom}"  # sig_no_dom(win,heat,top)
+                if sig!=sig0:
+                    ts=tick(); p=list(pair_ids); m=dict(OBS)
+                    pay=f"observe=conflict_heat; win={win}; total_heat={heat}; top=topic:{heat}:{dom}:{domc}"
+                    e=E(ts,new(ts,p,m,pay),p,m,pay); add(e); derived.append(e); prev=e.id; last_ts=ts
+                    sig0=sig; obs_p=list(pair_ids)
+                key0=(heat,dom)
+            if heat>=2 and last_ts-conf_ts>=cool:
+                ts=tick(); p=list(obs_p if obs_p else pair_ids); m=dict(NOISE)
+                pay=f"NOISE:{nonce()}:conflict(2):top=topic:{heat}:{dom}:{domc}:{label}; topic={topic}"
+                e=E(ts,new(ts,p,m,pay),p,m,pay); add(e); derived.append(e); prev=e.id; conf_ts=ts
+        self.last_obs_sig=sig0; self.last_obs_parents=obs_p; self.last_conflict_ts=conf_ts; self.last_id=prev
+        return evs,derived
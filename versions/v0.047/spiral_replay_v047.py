@@ -0,0 +1,121 @@
+# spiral_replay_v047.py  (deterministic replay of the v0.46 decision loop)
+# A script is the input side of a run, one JSON object per line, in order:
+#   {"ts":1700000000000,"topic":"x","label":"evt0:4203918","seed":true}
+#   {"ts":1700000000001,"topic":"y","label":"evt1:8812093","derived":[1700000000002]}
+#   {"ts":1700000000012,"topic":"z","label":"evt9:1173366","repair":[1700000000013,"x"],"derived":[1700000000014,1700000000015]}
+# "derived" holds the timestamps of the observe / noise events that followed the step. They are not
+# decisions, only clock reads: replay feeds them back so the cooldown sees the recorded spacing.
+# Replay feeds the steps to SimLoop. SimLoop re-derives every observe / noise event. Ids and noise nonces
+# come from a counter IdGenerator, and timestamps come from the script's recorded clock reads (the
+# previous ts + 1 once a step's reads run out). The same script therefore gives a byte-identical history
+# on every run and every History class, and it never reads the wall clock.
+import hashlib
+import json
+from collections import deque
+
+import spiral_core_v047 as core
+from spiral_core_v047 import Clock, History, IdGenerator, InvariantMonitor, SimLoop
+
+class _Reads:
+    # Clock source that replays one step's recorded clock reads, then stays at the last one
+    def __init__(self,t): self.t=t; self.q=deque()
+    def __call__(self):
+        if self.q: self.t=self.q.popleft()
+        return self.t
+
+def record_script(h):
+    """The input script of a history: one step per input, with the repair input (meta repair=True) that
+    follows it and the timestamps of the derived events after it.
+
+    The first step is marked seed: it starts the run without a derive step, as main()'s evt0 does.
+    Histories from before the marker (v0.046) are read by payload: a "repair: summarize; topic=" input
+    right after a step's input, before anything was derived from it."""
+    steps=[]
+    for e in h.events:
+        m=e.meta
+        if m.get("kind")!="input":
+            if steps: steps[-1].setdefault("derived",[]).append(e.ts)
+            continue
+        topic=m.get("topic","?")
+        if steps and (m.get("repair") or _unmarked_repair(e,steps[-1])): steps[-1]["repair"]=[e.ts,topic]; continue
+        label=e.payload.rsplit("; topic=",1)[0]
+        steps.append({"ts":e.ts,"topic":topic,"label":label})
+    if steps: steps[0]["seed"]=True
+    return steps
+
+def _unmarked_repair(e,last):
+    # v0.046 repair: no meta marker, so its payload and place in the step (input, repair, derived) tell
+    return "derived" not in last and "repair" not in last and e.payload.startswith("repair: summarize; topic=")
+
+def save_script(steps,fp):
+    for s in steps: fp.write(json.dumps(s,ensure_ascii=False,separators=(",",":"))+"\n")
+
+def load_script(fp):
+    # steps from a script file object; bad lines raise ValueError with file:line
+    name=getattr(fp,"name","<script>"); out=[]
+    for ln,line in enumerate(fp,1):
+        if not line.strip(): continue
+        try:
+            s=json.loads(line); s["ts"],s["topic"],s["label"]
+        except (ValueError,KeyError,TypeError) as x:
+            raise ValueError(f"{name}:{ln}: bad script step: {x!r}") from None
+        out.append(s)
+    return out
+
+def replay(steps,history_cls=History,win=14,cooldown_ms=2,id_start=0,check=True):
+    """Re-drive SimLoop over a script into a new history_cls(); returns the history.
+
+    Event ids and noise nonces come from IdGenerator("counter", id_start). The global generator is
+    swapped for the run and restored afterwards. check=True attaches a fail-fast InvariantMonitor."""
+    h=history_cls(); src=_Reads(steps[0]["ts"]-1 if steps else 0); clk=Clock(src); q=src.q
+    gen=IdGenerator("counter",id_start); prev=core.ID_GEN; core.set_id_generator(gen)
+    try:
+        loop=SimLoop(h,clk,win=win,cooldown_ms=cooldown_ms,nonce=gen.nonce)
+        if check: InvariantMonitor(h)
+        for s in steps:
+            rep=s.get("repair")
+            q.clear(); q.append(s["ts"])
+            if rep: q.append(rep[0])
+            q.extend(s.get("derived",()))
+            loop.input(s["topic"],s["label"])
+            if rep: loop.repair(rep[1])
+            if not s.get("seed"): loop.derive()
+    finally:
+        core.set_id_generator(prev)
+    return h
+
+def digest(h):
+    # blake2b of the history's JSONL export: equal digests = byte-identical histories
+    from spiral_jsonl_v047 import export_jsonl
+    class _Sink:
+        def __init__(self): self.b=hashlib.blake2b(digest_size=16)
+        def write(self,s): self.b.update(s.encode())
+    sink=_Sink(); export_jsonl(h,sink)
+    return sink.b.hexdigest()
+
+if __name__=="__main__":
+    import sys
+    args=sys.argv[1:]
+    if args[:1]==["record"] and len(args)>=2:
+        # record HISTORY.jsonl SCRIPT.jsonl   or   record SCRIPT.jsonl (the main() demo run)
+        if len(args)>=3:
+            from spiral_jsonl_v047 import iter_jsonl
+            h=History()
+            with open(args[1],encoding="utf-8") as f: h.extend(iter_jsonl(f))
+        else:
+            import contextlib, io
+            with contextlib.redirect_stdout(io.StringIO()): h=core.main()
+        steps=record_script(h)
+        with open(args[-1],"w",encoding="utf-8") as f: save_script(steps,f)
+        print(f"recorded {len(steps)} steps from {len(h.events)} events -> {args[-1]}")
+    elif args[:1]==["run"] and len(args)>=2:
+        # run SCRIPT.jsonl [--out HISTORY.jsonl] [--columnar]
+        with open(args[1],encoding="utf-8") as f: steps=load_script(f)
+        h=replay(steps,core.ColumnarHistory if "--columnar" in args else History)
+        print(f"replayed {len(steps)} steps -> {len(h.events)} events, digest {digest(h)}")
+        if "--out" in args[:-1]:
+            from spiral_jsonl_v047 import export_jsonl
+            with open(args[args.index("--out")+1],"w",encoding="utf-8") as f: export_jsonl(h,f)
+    else:
+        print("usage: spiral_replay_v047.py record [HISTORY.jsonl] SCRIPT.jsonl | run SCRIPT.jsonl [--out H.jsonl] [--columnar]")
+        sys.exit(2)
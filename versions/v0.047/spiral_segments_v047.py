@@ -0,0 +1,651 @@
+# spiral_segments_v047.py  (append-only binary segment log for History persistence)
+# dir/seg-000000.spl, seg-000001.spl, ... rotated by size; a segment is never rewritten once closed.
+# Little-endian throughout.
+#
+#   segment := header block* footer trailer
+#   header  := b"SPSEG01\n" first_pos:u64
+#   block   := raw_len:u32 stored_len:u32 codec:u8 data[stored_len]          codec 0 = raw, 1 = zlib
+#   data    := n:u32                                                          records, append order
+#              ts:i64[n] id:u64[n] kind:u8[n] npar:u16[n] meta:u16[n] paylen:u32[n]   fixed-width headers
+#              payload[sum(paylen)] parent:varint*                            variable part
+#   footer  := section*, then (tag:4s off:u64 len:u64)[k] count:u32           section table
+#   trailer := table_off:u64 n:u64 b"SPSEGEND"
+#
+# Headers are stored column-wise per block (one fixed-width field per array) so a loader can lift them
+# with array.frombytes; paylen is the payload's length prefix, moved into the header. parent =
+# zigzag(pos - parent_pos) + 1, with 0 meaning a dangling parent followed by varint len + utf-8 id.
+# meta and kind are codes into the segment's META / KIND tables (JSON).
+# Sections: BLKS (per block: file offset u64, first ordinal u32, n u32, ts_min i64, ts_max i64),
+# KIND, META, XIDS (JSON {ordinal: id} for ids that are not 16-hex; their id column holds 0),
+# and the read-side indexes MappedHistory queries in place:
+#   INFO  JSON {ts_first, ts_last, ts_sorted, ids, edges}
+#   IDIX  8-aligned, uncompressed: id:u64[ids] sorted, then ordinal:u32[ids]      (bisected through mmap)
+#   EDGE  zlib(parent_pos:u64[edges] sorted, child_pos-parent_pos:u64[edges])      (positioned parents only)
+#   MPOS  hlen:u32 JSON [[field, value, count, off, len], ...] then zlib(ordinal:u32[count]) per key
+# EDGE parent positions and MPOS ordinals are stored as deltas from the previous entry (first: from 0).
+# Segments written before INFO/IDIX/EDGE/MPOS existed are indexed by a block scan on first use.
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import cached_property
+from itertools import accumulate, chain, compress, islice, repeat
+from operator import gt, rshift, sub
+
+from spiral_core_v047 import INDEXED_META, Event, History, _EventColumn, _HistoryQueries, _IdIndex, _id_key, meta_key
+
+MAGIC=b"SPSEG01\n"; END=b"SPSEGEND"
+_HDR=struct.Struct("<8sQ"); _BLK=struct.Struct("<IIB"); _TRAILER=struct.Struct("<QQ8s")
+_SEC=struct.Struct("<4sQQ"); _BLKS=struct.Struct("<QIIqq")
+
+def _put_varint(out,v):
+    while v>0x7f:
+        out.append((v&0x7f)|0x80); v>>=7
+    out.append(v)
+
+def _get_varints(buf,off,count):
+    # count varints from buf[off:] -> (list, end offset)
+    out=[]; ap=out.append
+    for _ in range(count):
+        b=buf[off]; off+=1
+        if b<0x80: ap(b); continue
+        v=b&0x7f; sh=7
+        while True:
+            b=buf[off]; off+=1
+            v|=(b&0x7f)<<sh
+            if b<0x80: break
+            sh+=7
+        ap(v)
+    return out,off
+
+def _seg_name(n): return f"seg-{n:06d}.spl"
+
+def list_segments(path):
+    return sorted(os.path.join(path,f) for f in os.listdir(path) if f.startswith("seg-") and f.endswith(".spl"))
+
+class SegmentWriter:
+    """Appends records at global positions first_pos, first_pos+1, ... into size-rotated segments.
+
+    A segment is closed (footer + trailer written) once it reaches max_bytes, and by close().
+    index=False leaves out the INFO/IDIX/EDGE/MPOS read indexes (about 16 B/event): MappedHistory then
+    rebuilds them with one block scan the first time a segment is queried."""
+    def __init__(self,path,first_pos=0,max_bytes=64<<20,block_events=4096,level=1,index=True):
+        os.makedirs(path,exist_ok=True)
+        self.path=path; self.pos=first_pos; self.max_bytes=max_bytes; self.index=index
+        self.block_events=block_events; self.level=level
+        segs=list_segments(path)
+        self.seq=int(os.path.basename(segs[-1])[4:10])+1 if segs else 0
+        self.fp=None; self._new_block()
+
+    def _open(self):
+        self.fp=open(os.path.join(self.path,_seg_name(self.seq)),"wb"); self.seq+=1
+        self.fp.write(_HDR.pack(MAGIC,self.pos))
+        self.pos0=self.pos; self.seg_n=0; self.blocks=[]; self.kinds={}; self.metas={}; self.meta_items=[]; self.xids={}
+        # read-side indexes (INFO/IDIX/EDGE/MPOS)
+        self.ix_id=array('Q'); self.ix_ord=array('I'); self.e_par=array('Q'); self.e_child=array('I')
+        self.mpos={}; self.mcols=[]; self.n_fed=0; self.ts_first=self.ts_last=None; self.ts_sorted=True
+
+    def _new_block(self):
+        self.b_xids=0; self.b_ts=[]; self.b_id=[]; self.b_kind=[]; self.b_npar=[]; self.b_meta=[]; self.b_len=[]
+        self.b_par=bytearray(); self.b_pay=bytearray()
+
+    def append(self,ts,eid,parents,meta,payload):
+        # parents: global positions (int) or dangling id strings
+        if self.fp is None: self._open()
+        k=_id_key(eid)
+        if k is None: self.xids[self.seg_n+len(self.b_ts)]=eid; self.b_xids+=1
+        kind=meta.get("kind"); kc=self.kinds.get(kind)
+        if kc is None:
+            if len(self.kinds)==256: raise ValueError("segment kind table full (256)")
+            kc=self.kinds[kind]=len(self.kinds)
+        items=tuple(meta.items()); mkey=meta_key(items); mc=self.metas.get(mkey)
+        if mc is None:
+            if len(self.metas)==65536: raise ValueError("segment meta table full (65536)")
+            mc=self.metas[mkey]=len(self.metas); self.meta_items.append(items)
+        par=self.b_par; i=self.pos
+        for p in parents:
+            if isinstance(p,str):
+                b=p.encode(); par.append(0); _put_varint(par,len(b)); par+=b
+            else:
+                d=i-p; _put_varint(par,((d<<1) if d>=0 else ((-d<<1)-1))+1)
+        if isinstance(payload,str): payload=payload.encode()
+        self.b_ts.append(ts); self.b_id.append(k or 0); self.b_kind.append(kc)
+        self.b_npar.append(len(parents)); self.b_meta.append(mc); self.b_len.append(len(payload))
+        self.b_pay+=payload; self.pos+=1
+        if len(self.b_ts)>=self.block_events: self.flush()
+
+    def flush(self):
+        # write the open block; rotate once the segment is over max_bytes
+        n=len(self.b_ts)
+        if not n: return
+        if self.index: self._index_block()
+        raw=bytearray(struct.pack("<I",n))
+        raw+=_le('q',self.b_ts); raw+=_le('Q',self.b_id); raw+=bytes(self.b_kind)
+        raw+=_le('H',self.b_npar); raw+=_le('H',self.b_meta); raw+=_le('I',self.b_len)
+        raw+=self.b_pay; raw+=self.b_par
+        data=zlib.compress(raw,self.level) if self.level else bytes(raw)
+        off=self.fp.tell()
+        self.fp.write(_BLK.pack(len(raw),len(data),1 if self.level else 0)); self.fp.write(data)
+        self.blocks.append((off,self.seg_n,n,min(self.b_ts),max(self.b_ts)))
+        self.seg_n+=n; self._new_block()
+        if self.fp.tell()>=self.max_bytes: self._close_segment()
+
+    def _index_block(self):
+        # the open block's share of INFO/IDIX/EDGE/MPOS, a column at a time
+        o0=self.seg_n; n=len(self.b_ts); ts=self.b_ts; rng=range(o0,o0+n)
+        if self.ts_last is None: self.ts_first=ts[0]
+        elif ts[0]<self.ts_last: self.ts_sorted=False
+        if self.ts_sorted and any(map(gt,ts,islice(ts,1,None))): self.ts_sorted=False
+        self.ts_last=ts[-1]
+        if not self.b_xids: self.ix_id.extend(self.b_id); self.ix_ord.extend(rng)
+        else:
+            for o,k in zip(rng,self.b_id):
+                if o not in self.xids: self.ix_id.append(k); self.ix_ord.append(o)
+        refs,dangling=_decode_refs(bytes(self.b_par),self.pos-n,self.b_npar)
+        if not dangling: self.e_par.extend(refs); self.e_child.extend(_owners(o0,self.b_npar))
+        else:
+            for r,o in zip(refs,_owners(o0,self.b_npar)):
+                if type(r) is int: self.e_par.append(r); self.e_child.append(o)
+        if self.n_fed<len(self.metas):
+            # metas first seen in this block: extend the code sets feeding each (field, value) key
+            feeds={}
+            for c,m in enumerate(self.meta_items):
+                d=dict(m)
+                for f in INDEXED_META:
+                    if d.get(f) is not None: feeds.setdefault((f,d[f]),set()).add(c)
+            self.mcols=[(self.mpos.setdefault(k,array('I')),codes,bytes(c in codes for c in range(256)))
+                        for k,codes in feeds.items()]
+            self.n_fed=len(self.metas)
+        _index_meta(self.mcols,array('H',self.b_meta),o0)
+
+    def _close_segment(self):
+        fp=self.fp; secs=[]
+        def section(tag,body):
+            secs.append((tag,fp.tell(),len(body))); fp.write(body)
+        section(b"BLKS",b"".join(_BLKS.pack(*b) for b in self.blocks))
+        section(b"KIND",json.dumps(list(self.kinds)).encode())
+        section(b"META",json.dumps([list(map(list,m)) for m in self.meta_items],ensure_ascii=False).encode())
+        if self.xids: section(b"XIDS",json.dumps(self.xids,ensure_ascii=False).encode())
+        if self.index: self._index_sections(section)
+        table_off=fp.tell()
+        for s in secs: fp.write(_SEC.pack(*s))
+        fp.write(struct.pack("<I",len(secs)))
+        fp.write(_TRAILER.pack(table_off,self.seg_n,END))
+        fp.close(); self.fp=None
+
+    def _index_sections(self,section):
+        fp=self.fp; m=len(self.ix_id); order=sorted(range(m),key=self.ix_id.__getitem__)  # stable: duplicate ids keep append order
+        section(b"INFO",json.dumps({"ts_first":self.ts_first,"ts_last":self.ts_last,"ts_sorted":self.ts_sorted,
+                                    "ids":m,"edges":len(self.e_par)}).encode())
+        fp.write(bytes(-fp.tell()%8))
+        section(b"IDIX",_le('Q',map(self.ix_id.__getitem__,order))+_le('I',map(self.ix_ord.__getitem__,order)))
+        order=sorted(range(len(self.e_par)),key=self.e_par.__getitem__)
+        section(b"EDGE",zlib.compress(_le('Q',_delta(map(self.e_par.__getitem__,order)))
+                                      +_le('Q',[self.pos0+self.e_child[x]-self.e_par[x] for x in order]),self.level or 1))
+        head=[]; blobs=bytearray()
+        for (f,v),col in self.mpos.items():
+            z=zlib.compress(_le('I',_delta(col)),self.level or 1); head.append([f,v,len(col),len(blobs),len(z)]); blobs+=z
+        head=json.dumps(head,ensure_ascii=False).encode()
+        section(b"MPOS",struct.pack("<I",len(head))+head+blobs)
+
+    def close(self):
+        self.flush()
+        if self.fp is not None: self._close_segment()
+
+class Segment:
+    """One closed segment file: header, footer sections, block decoding and the read-side indexes.
+
+    buf may be the file's bytes or an mmap; footer tables are parsed on first use, so opening costs
+    the trailer and section table only."""
+    def __init__(self,path,buf=None):
+        if buf is None:
+            with open(path,"rb") as f: buf=f.read()
+        self.path=path; self.buf=buf; self.view=memoryview(buf)
+        magic,self.first_pos=_HDR.unpack_from(buf,0)
+        table_off,self.n,end=_TRAILER.unpack_from(buf,len(buf)-_TRAILER.size)
+        if magic!=MAGIC or end!=END: raise ValueError(f"not a closed spiral segment: {path}")
+        (k,)=struct.unpack_from("<I",buf,len(buf)-_TRAILER.size-4)
+        self.sections={tag:(off,ln) for tag,off,ln in _SEC.iter_unpack(buf[table_off:table_off+k*_SEC.size])}
+        self._mpos_cols={}
+
+    def section(self,tag):
+        off,ln=self.sections.get(tag,(0,0))
+        return self.buf[off:off+ln]
+
+    @cached_property
+    def blocks(self): return list(_BLKS.iter_unpack(self.section(b"BLKS")))
+    @cached_property
+    def block_first(self): return [b[1] for b in self.blocks]
+    @cached_property
+    def kinds(self): return json.loads(self.section(b"KIND"))
+    @cached_property
+    def metas(self): return [tuple(map(tuple,m)) for m in json.loads(self.section(b"META"))]
+    @cached_property
+    def xids(self): return {int(i):x for i,x in json.loads(self.section(b"XIDS") or b"{}").items()}
+    @cached_property
+    def xid_ord(self): return {x:i for i,x in sorted(self.xids.items())}  # last ordinal wins, as in by_id
+
+    def block(self,b):
+        # decoded columns of block b: (first_pos, ts, ids, kind, npar, par_bytes, meta, paylen, payload)
+        off,first,n,_,_=self.blocks[b]
+        raw_len,stored,codec=_BLK.unpack_from(self.buf,off)
+        data=self.view[off+_BLK.size:off+_BLK.size+stored]
+        raw=zlib.decompress(data) if codec==1 else bytes(data)
+        ts,o=_column('q',raw,4,n); ids,o=_column('Q',raw,o,n)
+        kind=raw[o:o+n]; o+=n
+        npar,o=_column('H',raw,o,n); meta,o=_column('H',raw,o,n); plen,o=_column('I',raw,o,n)
+        end=o+sum(plen)
+        return self.first_pos+first,ts,ids,kind,npar,raw[end:],meta,plen,raw[o:end]
+
+    # ---- read-side indexes (INFO / IDIX / EDGE / MPOS), or a one-off block scan for older segments ----
+
+    @cached_property
+    def info(self):
+        b=self.section(b"INFO")
+        return json.loads(b) if b else self._scan["info"]
+
+    @cached_property
+    def idix(self):
+        # (sorted 16-hex id keys, their ordinals); zero-copy views when buf is an mmap on a little-endian host
+        if b"IDIX" not in self.sections: return self._scan["idix"]
+        off,_=self.sections[b"IDIX"]; m=self.info["ids"]
+        if isinstance(self.buf,mmap.mmap) and sys.byteorder=="little":
+            return self.view[off:off+8*m].cast('Q'),self.view[off+8*m:off+12*m].cast('I')
+        ids,o=_column('Q',self.buf,off,m)
+        return ids,_column('I',self.buf,o,m)[0]
+
+    def find(self,eid):
+        # ordinal of the last record with id eid, or None
+        k=_id_key(eid)
+        if k is None: return self.xid_ord.get(eid)
+        ids,ords=self.idix
+        x=bisect_right(ids,k)-1
+        return ords[x] if x>=0 and ids[x]==k else None
+
+    @cached_property
+    def edges(self):
+        # (parent positions sorted, child ordinals): the segment's positioned parent refs
+        if b"EDGE" not in self.sections: return self._scan["edges"]
+        raw=zlib.decompress(self.section(b"EDGE")); m=self.info["edges"]
+        par,o=_column('Q',raw,0,m); par=array('Q',accumulate(par)); f=self.first_pos
+        return par,array('I',[p+d-f for p,d in zip(par,_column('Q',raw,o,m)[0])])
+
+    @cached_property
+    def mpos(self):
+        # (field, value) -> (count, off, len) of its ordinal list in MPOS
+        if b"MPOS" not in self.sections: return {k:(len(c),0,0) for k,c in self._scan["mpos"].items()}
+        off,_=self.sections[b"MPOS"]
+        (hl,)=struct.unpack_from("<I",self.buf,off); base=off+4+hl
+        return {(f,v):(c,base+o,ln) for f,v,c,o,ln in json.loads(self.buf[off+4:base])}
+
+    def meta_positions(self,key):
+        # ordinals of the records indexed under key, decoded on first use
+        col=self._mpos_cols.get(key)
+        if col is None:
+            if b"MPOS" not in self.sections: col=self._scan["mpos"][key]
+            else:
+                c,o,ln=self.mpos[key]
+                col=array('I',accumulate(_column('I',zlib.decompress(self.view[o:o+ln]),0,c)[0]))
+            self._mpos_cols[key]=col
+        return col
+
+    @cached_property
+    def _scan(self):
+        # the INFO/IDIX/EDGE/MPOS contents rebuilt from the blocks (segments written without them)
+        ix=[]; e_par=array('Q'); e_child=array('I'); mpos={}; ts_all=array('q')
+        feeds=[[(f,d[f]) for f in INDEXED_META if d.get(f) is not None] for d in map(dict,self.metas)]
+        for b in range(len(self.blocks)):
+            i0,ts,ids,_,npar,par,meta,_,_=self.block(b); o0=i0-self.first_pos
+            ts_all.extend(ts)
+            ix.extend((k,o0+j) for j,k in enumerate(ids) if o0+j not in self.xids)
+            refs,_=_decode_refs(par,i0,npar)
+            for r,i in zip(refs,_owners(i0,npar)):
+                if type(r) is int: e_par.append(r); e_child.append(i-self.first_pos)
+            for j,c in enumerate(meta):
+                for key in feeds[c]: mpos.setdefault(key,array('I')).append(o0+j)
+        ix.sort(); order=sorted(range(len(e_par)),key=e_par.__getitem__)
+        info={"ts_first":ts_all[0] if ts_all else None,"ts_last":ts_all[-1] if ts_all else None,
+              "ts_sorted":all(x<=y for x,y in zip(ts_all,islice(ts_all,1,None))),"ids":len(ix),"edges":len(e_par)}
+        return {"info":info,"idix":(array('Q',[k for k,_ in ix]),array('I',[o for _,o in ix])),
+                "edges":(array('Q',map(e_par.__getitem__,order)),array('I',map(e_child.__getitem__,order))),
+                "mpos":mpos}
+
+    def release(self):
+        # drop the buffer views (an mmap cannot close while they are exported)
+        for name in ("idix",):
+            for v in self.__dict__.pop(name,()):
+                if isinstance(v,memoryview): v.release()
+        self.view.release()
+
+def _delta(values):
+    # ascending values -> differences from the previous one (first from 0); inverse: accumulate
+    values=list(values)
+    return list(map(sub,values,[0]+values[:-1]))
+
+def _le(typ,values):
+    col=array(typ,values)
+    if sys.byteorder!="little": col.byteswap()
+    return col.tobytes()
+
+def _column(typ,raw,o,n):
+    col=array(typ); end=o+col.itemsize*n
+    col.frombytes(raw[o:end])
+    if sys.byteorder!="little": col.byteswap()
+    return col,end
+
+_ODD=bytes(range(1,0x80,2))
+
+def _decode_refs(par,i0,npar):
+    # (flat parent refs of a block in record order, any dangling); a ref is a global position (int)
+    # or a dangling id (str)
+    if par and max(par)<0x80 and not par.translate(None,_ODD):
+        # common case, no Python loop: every parent 0..63 positions back, one byte each
+        return list(map(sub,_owners(i0,npar),map(rshift,par,repeat(1)))),False
+    out=[]; ap=out.append; o=0; i=i0; dangling=False
+    for c in npar:
+        for _ in range(c):
+            v=par[o]; o+=1
+            if v>=0x80:
+                v&=0x7f; sh=7
+                while True:
+                    x=par[o]; o+=1; v|=(x&0x7f)<<sh
+                    if x<0x80: break
+                    sh+=7
+            if v==0:
+                (ln,),o=_get_varints(par,o,1); ap(par[o:o+ln].decode()); o+=ln; dangling=True
+            elif v&1: ap(i-(v>>1))   # zigzag(d)+1 odd: d >= 0
+            else: ap(i+(v>>1))
+        i+=1
+    return out,dangling
+
+def _owners(i0,npar):
+    # position owning each flat parent ref
+    return chain.from_iterable(map(repeat,range(i0,i0+len(npar)),npar))
+
+def _payloads(pay,plen):
+    # payload strings of a block (a single decode when the blob is ascii)
+    offs=list(accumulate(plen,initial=0))
+    if pay.isascii():
+        s=pay.decode(); return [s[x:y] for x,y in zip(offs,islice(offs,1,None))]
+    return [pay[x:y].decode() for x,y in zip(offs,islice(offs,1,None))]
+
+def open_segments(path):
+    # Segments in order, read one at a time (only the current file is held in memory)
+    for p in list_segments(path): yield Segment(p)
+
+def stored_count(path):
+    # events already persisted in path (sum of segment record counts)
+    n=0
+    for p in list_segments(path):
+        with open(p,"rb") as f:
+            f.seek(-_TRAILER.size,os.SEEK_END)
+            n+=_TRAILER.unpack(f.read(_TRAILER.size))[1]
+    return n
+
+def write_segments(h,path,max_bytes=64<<20,block_events=4096,level=1,index=True):
+    """Append h's events that are not yet in path as new segments; returns the number written.
+
+    Segments already in path must hold a prefix of h (append-only: nothing is rewritten)."""
+    start=stored_count(path) if os.path.isdir(path) else 0
+    n=len(h.events)
+    if start>n: raise ValueError(f"{path} holds {start} events, history has {n}")
+    w=SegmentWriter(path,start,max_bytes,block_events,level,index)
+    if getattr(h,"uid",None) is not None:
+        # ColumnarHistory: straight from the columns, no Event objects
+        dang=h.dangling.values; metas=h.metas.values
+        for i in range(start,n):
+            ps=[j if j>=0 else dang[~j] for j in h.parent_idx(i)]
+            w.append(h.ts[i],h.id_at(i),ps,dict(metas[h.meta_code[i]]),h.pay[h.pay_off[i]:h.pay_off[i+1]])
+    else:
+        pos={}
+        for i,e in enumerate(h.events):
+            if i>=start: w.append(e.ts,e.id,[pos.get(p,p) for p in e.parent_ids],e.meta,e.payload)
+            pos[e.id]=i
+    w.close()
+    return n-start
+
+def _block_ids(seg,b,ids):
+    out=list(map("{:016x}".format,ids))
+    if seg.xids:
+        first=seg.blocks[b][1]
+        for j in range(len(ids)):
+            x=seg.xids.get(first+j)
+            if x is not None: out[j]=x
+    return out
+
+def _block_events(seg,b,ids):
+    # (first_pos, ts, meta codes, Events) of block b; ids holds every id before the block, extended in place
+    i0,ts,uid,kind,npar,par,meta,plen,pay=seg.block(b)
+    sid=_block_ids(seg,b,uid); ids.extend(sid)
+    refs,dangling=_decode_refs(par,i0,npar); pays=_payloads(pay,plen); metas=seg.metas
+    pids=[ids[r] if type(r) is int else r for r in refs] if dangling else list(map(ids.__getitem__,refs))
+    evs=[]; k=0
+    for j,c in enumerate(npar):
+        evs.append(Event(ts[j],sid[j],pids[k:k+c],dict(metas[meta[j]]),pays[j])); k+=c
+    return i0,ts,meta,evs
+
+def iter_segments(path):
+    # Events in append order, one block decoded at a time
+    ids=[]
+    for seg in open_segments(path):
+        for b in range(len(seg.blocks)): yield from _block_events(seg,b,ids)[3]
+
+def load_segments(path,cls=History):
+    """Read a segment directory back into a new cls() (History or ColumnarHistory).
+
+    Indexes are built a block at a time, not through add(); no listeners exist yet to miss it."""
+    h=cls(); segs=open_segments(path)
+    if getattr(h,"uid",None) is None: _load_history(h,segs)
+    else:
+        for seg in segs: _load_columnar(h,seg)
+    return h
+
+def _extend_ts(h,ts):
+    # append a block's ts column with add()'s ts_sorted / strict_ts rules
+    if (h.ts and ts and ts[0]<h.ts[-1]) or any(x>y for x,y in zip(ts,islice(ts,1,None))):
+        if h.strict_ts: raise ValueError("out-of-order ts in segment block")
+        h.ts_sorted=False
+    h.ts.extend(ts)
+
+def _meta_cols(h,seg,new):
+    # by_meta position lists this segment feeds, each with the meta codes that feed it (as a set and as a
+    # 256-entry 0/1 translate table for the common < 256 codes case)
+    feeds={}
+    for c,m in enumerate(seg.metas):
+        d=dict(m)
+        for f in INDEXED_META:
+            if d.get(f) is not None: feeds.setdefault((f,d[f]),set()).add(c)
+    out=[]
+    for k,codes in feeds.items():
+        if k not in h.by_meta: h.by_meta[k]=new()
+        out.append((h.by_meta[k],codes,bytes(c in codes for c in range(256))))
+    return out
+
+def _index_meta(cols,meta,i0):
+    rng=range(i0,i0+len(meta))
+    mb=bytes(meta.tolist()) if meta and max(meta)<256 else None
+    for col,codes,tab in cols:
+        col.extend(compress(rng,mb.translate(tab) if mb is not None else map(codes.__contains__,meta)))
+
+def _load_history(h,segs):
+    ids=[]; ch=h.children
+    for seg in segs:
+        cols=_meta_cols(h,seg,list)
+        for b in range(len(seg.blocks)):
+            i0=seg.first_pos+seg.block_first[b]
+            if i0!=len(h.events): raise ValueError(f"segment gap: expected position {len(h.events)}, got {i0}")
+            i0,ts,meta,evs=_block_events(seg,b,ids)
+            _extend_ts(h,ts)
+            h.events.extend(evs); h.by_id.update(zip(ids[i0:],evs))
+            for e in evs:
+                for p in e.parent_ids: ch.setdefault(p,[]).append(e.id)
+            _index_meta(cols,meta,i0)
+
+def _load_columnar(h,seg):
+    # ColumnarHistory columns straight from the block arrays (ids must be 16-hex)
+    if seg.xids: raise ValueError(f"ColumnarHistory needs 16-hex ids, got {next(iter(seg.xids.values()))!r}")
+    kcode=[h.kinds.code(k) for k in seg.kinds]
+    mcode=[h.metas.code_meta(m) for m in seg.metas]
+    tcode=[-1 if (t:=dict(m).get("topic")) is None else h.topics.code(t) for m in seg.metas]
+    cols=_meta_cols(h,seg,lambda: array('q'))
+    pidx=h.par_idx; ch=h.child_head; cn=h.child_next; cp=h.child_pos
+    for b in range(len(seg.blocks)):
+        i0,ts,ids,kind,npar,par,meta,plen,pay=seg.block(b)
+        if i0!=len(h.ts): raise ValueError(f"segment gap: expected position {len(h.ts)}, got {i0}")
+        _extend_ts(h,ts); h.uid.extend(ids)
+        h.kind.extend(map(kcode.__getitem__,kind))
+        h.topic.extend(map(tcode.__getitem__,meta)); h.meta_code.extend(map(mcode.__getitem__,meta))
+        h.pay+=pay; h.pay_off.extend(islice(accumulate(plen,initial=h.pay_off[-1]),1,None))
+        ch.extend(array('q',[-1])*len(ts))
+        refs,dangling=_decode_refs(par,i0,npar)
+        if not dangling:
+            x=len(cp); pidx.extend(refs); cp.extend(_owners(i0,npar))
+            for r in refs: cn.append(ch[r]); ch[r]=x; x+=1
+        else:
+            for r,i in zip(refs,_owners(i0,npar)):
+                if type(r) is int:
+                    pidx.append(r); cn.append(ch[r]); ch[r]=len(cp); cp.append(i)
+                else: pidx.append(~h.dangling.code(r))
+        h.par_off.extend(islice(accumulate(npar,initial=h.par_off[-1]),1,None))
+        _index_meta(cols,meta,i0)
+        h.pos.update(zip(ids,range(i0,i0+len(ts))))
+
+# ---- read-only history over mmapped segments ----
+
+class _Block:
+    # one decoded block, as MappedHistory.event reads it
+    __slots__=("i0","ts","uid","xids","first","roff","refs","meta","metas","poff","pay")
+    def __init__(self,seg,b):
+        i0,self.ts,self.uid,_,npar,par,self.meta,plen,self.pay=seg.block(b)
+        self.i0=i0; self.first=i0-seg.first_pos; self.xids=seg.xids; self.metas=seg.metas
+        refs,dangling=_decode_refs(par,i0,npar)
+        self.refs=refs if dangling else array('q',refs)
+        self.roff=array('I',accumulate(npar,initial=0)); self.poff=array('I',accumulate(plen,initial=0))
+    def id(self,j):
+        x=self.xids.get(self.first+j) if self.xids else None
+        return f"{self.uid[j]:016x}" if x is None else x
+
+class _MappedTs(Sequence):
+    # ts column view; a lookup decodes (and caches) the block holding it
+    __slots__=("_h",)
+    def __init__(self,h): self._h=h
+    def __len__(self): return self._h.n
+    def __getitem__(self,i):
+        n=self._h.n
+        if isinstance(i,slice): return [self[j] for j in range(*i.indices(n))]
+        if i<0: i+=n
+        if not 0<=i<n: raise IndexError("ts index out of range")
+        blk=self._h._block_at(i)
+        return blk.ts[i-blk.i0]
+
+class _MappedIds(_IdIndex):
+    # by_id view; len/iteration go by position (a re-used id is counted once per record)
+    __slots__=()
+    def __len__(self): return self._h.n
+    def __iter__(self):
+        h=self._h
+        for i in range(h.n): yield h.id_at(i)
+
+class _PosList(Sequence):
+    # global positions of one (field, value) key; each segment's ordinal list is decoded on first touch
+    __slots__=("key","segs","cum")
+    def __init__(self,key,segs):
+        self.key=key; self.segs=segs
+        self.cum=list(accumulate((s.mpos[key][0] for s in segs),initial=0))
+    def __len__(self): return self.cum[-1]
+    def __getitem__(self,i):
+        n=self.cum[-1]
+        if isinstance(i,slice): return [self[j] for j in range(*i.indices(n))]
+        if i<0: i+=n
+        if not 0<=i<n: raise IndexError("position index out of range")
+        k=bisect_right(self.cum,i)-1; seg=self.segs[k]
+        return seg.first_pos+seg.meta_positions(self.key)[i-self.cum[k]]
+
+class _MappedMeta:
+    # the by_meta.get surface _HistoryQueries.positions uses
+    __slots__=("_h","_cols")
+    def __init__(self,h): self._h=h; self._cols={}
+    def get(self,key,default=None):
+        col=self._cols.get(key)
+        if col is None:
+            segs=[s for s in self._h.segs if key in s.mpos]
+            if not segs: return default
+            col=self._cols[key]=_PosList(key,segs)
+        return col
+
+class MappedHistory(_HistoryQueries):
+    """Read-only History over a segment directory, with no load step.
+
+    Segment files are mmapped and opening reads each trailer and section table only. events[i] / ts[i]
+    decode the block holding i on first touch and keep the last `cache_blocks` decoded blocks; by_id
+    bisects each segment's id index in place, newest segment first; positions()/last() and children_of()
+    decode a segment's MPOS / EDGE entries when a query first reaches that segment. Resident memory
+    follows the blocks and segments touched, not the size of the log."""
+    strict_ts=False
+    def __init__(self,path,cache_blocks=32):
+        self.path=path; self.segs=[]; self.n=0
+        for p in list_segments(path):
+            with open(p,"rb") as f: mm=mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+            seg=Segment(p,mm)
+            if seg.first_pos!=self.n: raise ValueError(f"segment gap: expected position {self.n}, got {seg.first_pos} in {p}")
+            self.segs.append(seg); self.n+=seg.n
+        self.starts=[s.first_pos for s in self.segs]
+        self.cache=OrderedDict(); self.cache_blocks=cache_blocks
+        self.ts=_MappedTs(self); self.events=_EventColumn(self); self.by_id=_MappedIds(self); self.by_meta=_MappedMeta(self)
+
+    @cached_property
+    def ts_sorted(self):
+        infos=[s.info for s in self.segs if s.n]
+        return all(x["ts_sorted"] for x in infos) and all(a["ts_last"]<=b["ts_first"] for a,b in zip(infos,infos[1:]))
+
+    def add(self,e): raise TypeError("MappedHistory is read-only; append with History and save_segments")
+    def subscribe(self,fn): pass  # nothing is ever added, so listeners never fire
+
+    def __len__(self): return self.n
+
+    def _block_at(self,i):
+        s=bisect_right(self.starts,i)-1; seg=self.segs[s]
+        b=bisect_right(seg.block_first,i-seg.first_pos)-1
+        blk=self.cache.get((s,b))
+        if blk is None:
+            blk=self.cache[(s,b)]=_Block(seg,b)
+            if len(self.cache)>self.cache_blocks: self.cache.popitem(last=False)
+        else: self.cache.move_to_end((s,b))
+        return blk
+
+    def id_at(self,i):
+        blk=self._block_at(i)
+        return blk.id(i-blk.i0)
+    def index_of(self,eid):
+        for seg in reversed(self.segs):
+            o=seg.find(eid)
+            if o is not None: return seg.first_pos+o
+        return None
+    def children_of(self,eid):
+        i=self.index_of(eid)
+        if i is None: return ()
+        out=[]
+        for seg in self.segs[bisect_right(self.starts,i)-1:]:
+            par,child=seg.edges
+            lo=bisect_left(par,i); hi=bisect_right(par,i,lo)
+            out.extend(self.id_at(seg.first_pos+c) for c in child[lo:hi])
+        return out
+    def _at(self,i): return self.event(i)
+    def event(self,i):
+        blk=self._block_at(i); j=i-blk.i0
+        pids=[self.id_at(r) if type(r) is int else r for r in blk.refs[blk.roff[j]:blk.roff[j+1]]]
+        return Event(blk.ts[j],blk.id(j),pids,dict(blk.metas[blk.meta[j]]),blk.pay[blk.poff[j]:blk.poff[j+1]].decode())
+
+    def close(self):
+        self.cache.clear()
+        for seg in self.segs:
+            mm=seg.buf; seg.release(); mm.close()
+        self.segs=[]; self.starts=[]; self.n=0
+    def __enter__(self): return self
+    def __exit__(self,*exc): self.close()
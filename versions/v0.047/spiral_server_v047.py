@@ -0,0 +1,214 @@
+# spiral_server_v047.py  (asyncio ingestion server: many producers, one writer, frontier snapshots)
+# Newline-delimited JSON over a Unix domain socket or localhost TCP, one object per line:
+#   {"topic":"x","label":"evt7:1234567"}                  input; optional "repair":"y" (a repair input after it)
+#   {"op":"frontier"}                                     latest frontier snapshot, answered at once
+# Replies, one line each:
+#   {"n":4711}                                            input appended; n = events in h after its batch
+#   {"error":"..."}                                       bad input line (in order with the acks)
+#   {"n":...,"inputs":...,"derived":...,"queued":...,"recent":[...],"global":[...]}    snapshot
+# Acks and errors come back in request order per connection. Snapshot replies skip the queue: they can
+# arrive ahead of acks for earlier inputs, so readers usually keep their own connection.
+#
+# Backpressure: each connection parses its lines and puts them on one bounded asyncio.Queue. When the
+# queue is full, put() waits, the connection stops reading, and the socket buffers fill up to the producer.
+# One writer task drains up to `chunk` queued inputs at a time through SpiralPipeline (one h.extend) and
+# then acks them. Every `snapshot_ms` the frontier snapshot is rebuilt in a worker thread, so readers never
+# wait on ingestion and the loop keeps reading connections. The writer holds its next h.extend until a
+# running snapshot is done, so the thread never sees h mid-append.
+# A connection that reaches EOF is closed by the writer after its last ack. If the writer fails, queued
+# and later inputs are answered {"error":"writer failed: ..."} and their connections closed.
+import asyncio
+import json
+import os
+import signal
+import time
+
+from spiral_core_v047 import History, frontier
+from spiral_pipeline_v047 import SpiralPipeline
+
+_enc=json.JSONEncoder(ensure_ascii=False,separators=(",",":")).encode
+
+def _row(e):
+    return {"ts":e.ts,"id":e.id,"kind":e.meta.get("kind"),"parents":list(e.parent_ids),"payload":e.payload}
+
+class IngestServer:
+    """Asyncio front end for one History: producers send inputs, a single writer task appends them.
+
+        srv=IngestServer(History()); await srv.start(path="/tmp/spiral.sock")   # or port=0 for TCP
+        ...; await srv.close()
+
+    queue_max   bounded queue between connections and the writer (backpressure)
+    chunk       inputs per writer batch (one SpiralPipeline chunk, one h.extend)
+    snapshot_ms frontier snapshot refresh interval, checked after each batch and when idle
+    wal         optional WriteAheadLog attached to h; synced before a batch is acked, so an ack is durable
+    limit       per-connection ack bytes buffered before that connection stops reading
+
+    stop() (SIGTERM in the CLI) ends serve_forever; close() then acks everything already received."""
+    def __init__(self,h=None,queue_max=4096,chunk=1024,snapshot_ms=50,wal=None,limit=1<<20,**pipeline_kw):
+        self.h=History() if h is None else h; self.wal=wal
+        if wal is not None: wal.attach(self.h)
+        self.pipe=SpiralPipeline(self.h,chunk=chunk,**pipeline_kw)
+        self.queue_max=queue_max; self.chunk=chunk; self.snapshot_ms=snapshot_ms; self.limit=limit
+        self.queue=None; self.server=None; self.writer_task=None; self.path=None; self.port=None
+        self.conns={}; self.batches=0; self.snap=b'{"n":0}\n'; self.snap_t=0.0; self.snap_n=-1
+        self.snap_fut=None; self.stopped=None; self.error=None
+        self.threaded=getattr(self.h,"db",None) is None  # a sqlite connection stays on its own thread
+
+    async def start(self,path=None,host="127.0.0.1",port=0):
+        # listen on a Unix socket at path, else on host:port (port 0 = pick a free one, see self.port)
+        self.queue=asyncio.Queue(self.queue_max)
+        if path is not None:
+            if os.path.exists(path): os.unlink(path)
+            self.server=await asyncio.start_unix_server(self._conn,path); self.path=path
+        else:
+            self.server=await asyncio.start_server(self._conn,host,port)
+            self.port=self.server.sockets[0].getsockname()[1]
+        self.stopped=asyncio.get_running_loop().create_future()
+        self._snapshot()
+        self.writer_task=asyncio.create_task(self._writer())
+        self.writer_task.add_done_callback(self._writer_done)
+        return self
+
+    def stop(self):
+        # end serve_forever; safe from a signal handler
+        if not self.stopped.done(): self.stopped.set_result(None)
+
+    async def close(self):
+        # stop accepting and reading; lines already received are queued, written and acked, then the
+        # writer is cancelled and the WAL closed
+        self.server.close()
+        conns=list(self.conns.values())
+        for reader,_ in conns: reader.feed_eof()
+        await asyncio.gather(*(t for _,t in conns),return_exceptions=True)
+        await self.queue.join()  # a failed writer has already answered the queue
+        if not self.writer_task.done():
+            self.writer_task.cancel()
+            try: await self.writer_task
+            except asyncio.CancelledError: pass
+        if self.snap_fut is not None: await asyncio.wait((self.snap_fut,))
+        for w in list(self.conns): w.close()
+        await self.server.wait_closed()
+        if self.wal is not None: self.wal.close()
+        if self.path is not None and os.path.exists(self.path): os.unlink(self.path)
+
+    async def _conn(self,reader,w):
+        put=self.queue.put; tr=w.transport; self.conns[w]=(reader,asyncio.current_task())
+        try:
+            async for line in reader:
+                if not line.strip(): continue
+                try:
+                    d=json.loads(line)
+                    op=d.get("op")
+                    if op=="frontier":
+                        w.write(self.snap); continue
+                    if op is not None: raise ValueError(f"unknown op {op!r}")
+                    x=(d["topic"],d["label"],d.get("repair"))
+                    if not isinstance(x[0],str) or not isinstance(x[1],str): raise ValueError("topic and label must be strings")
+                    if x[2] is not None and not isinstance(x[2],str): raise ValueError("repair must be a string or null")
+                except (ValueError,KeyError,TypeError,AttributeError) as err:
+                    x=f"bad input line: {err!r}"  # acked as an error, in order
+                if self.error is not None: break
+                await put((w,x))
+                if self.error is not None: self._fail_queued(); break
+                if tr.get_write_buffer_size()>self.limit: await w.drain()  # a producer not reading its acks
+            else:
+                if self.error is None:
+                    await put((w,None))  # EOF: the writer closes w after the acks queued before it
+                    if self.error is not None: self._fail_queued()
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            del self.conns[w]
+        if self.error is not None and not w.is_closing(): w.write(_enc({"error":self.error}).encode()+b"\n")
+        w.close()
+
+    async def _writer(self):
+        q=self.queue; get=q.get_nowait; chunk=self.chunk; push_many=self.pipe.push_many; h=self.h
+        while True:
+            try: items=[await asyncio.wait_for(q.get(),self.snapshot_ms/1000)]
+            except asyncio.TimeoutError:
+                self._snapshot(); continue
+            while len(items)<chunk and not q.empty(): items.append(get())
+            xs=[x for _,x in items if type(x) is tuple]
+            try:
+                if self.snap_fut is not None: await asyncio.wait((self.snap_fut,))  # h stays still under the thread
+                for _ in push_many(xs): pass
+                if self.wal is not None: self.wal.sync()
+            except Exception as err:
+                self.error=f"writer failed: {err!r}"
+                self._answer(items)
+                raise
+            ack=_enc({"n":len(h.events)}).encode()+b"\n"
+            for w,x in items:
+                if w.is_closing(): continue
+                if x is None: w.close()
+                else: w.write(ack if type(x) is tuple else _enc({"error":x}).encode()+b"\n")
+            for _ in items: q.task_done()
+            self.batches+=1
+            if (time.monotonic()-self.snap_t)*1000>=self.snapshot_ms: self._snapshot()
+            await asyncio.sleep(0)  # let connections and readers run between batches
+
+    def _answer(self,items):
+        # error replies for queued items the writer will not append; EOF markers just close
+        err=_enc({"error":self.error}).encode()+b"\n"
+        for w,x in items:
+            if not w.is_closing():
+                if x is not None: w.write(err)
+                w.close()
+            self.queue.task_done()
+
+    def _fail_queued(self):
+        # after a writer failure: answer whatever is queued, which also frees blocked put()s
+        q=self.queue; items=[]
+        while not q.empty(): items.append(q.get_nowait())
+        self._answer(items)
+
+    def _writer_done(self,task):
+        if task.cancelled(): return
+        if task.exception() is not None:
+            if self.error is None: self.error=f"writer failed: {task.exception()!r}"
+            self._fail_queued()
+        self.stop()
+
+    def _snapshot(self):
+        # frontier rows as of now, built in a worker thread and encoded once; readers get these bytes as
+        # they are. At most one build runs; the writer waits for it before its next h.extend.
+        h=self.h; n=len(h.events); self.snap_t=time.monotonic()
+        if n==self.snap_n or self.snap_fut is not None: return
+        self.snap_n=n
+        head={"n":n,"inputs":self.pipe.inputs,"derived":self.pipe.derived,"queued":self.queue.qsize()}
+        if not self.threaded:
+            self.snap=_snapshot_bytes(h,head); return
+        self.snap_fut=asyncio.get_running_loop().run_in_executor(None,_snapshot_bytes,h,head)
+        self.snap_fut.add_done_callback(self._snapshot_done)
+
+    def _snapshot_done(self,fut):
+        self.snap_fut=None
+        if fut.cancelled(): return
+        if fut.exception() is not None: self.snap_n=-1; return  # rebuilt on the next turn
+        self.snap=fut.result()
+
+    async def serve_forever(self):
+        # until stop() or the writer fails (its exception is raised here)
+        await asyncio.wait((self.writer_task,self.stopped),return_when=asyncio.FIRST_COMPLETED)
+        if self.writer_task.done() and not self.writer_task.cancelled(): self.writer_task.result()
+
+def _snapshot_bytes(h,head):
+    return _enc({**head,"recent":[_row(e) for e in frontier(h,mode="recent",topk=20,recent_k=10)],
+                 "global":[_row(e) for e in frontier(h,mode="global",topk=20)]}).encode()+b"\n"
+
+async def _main(args):
+    srv=IngestServer(queue_max=int(args[args.index("--queue")+1]) if "--queue" in args[:-1] else 4096)
+    if "--unix" in args[:-1]: await srv.start(path=args[args.index("--unix")+1])
+    else: await srv.start(port=int(args[args.index("--port")+1]) if "--port" in args[:-1] else 0)
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM,srv.stop)  # clean close on kill
+    print(f"listening on {srv.path or f'127.0.0.1:{srv.port}'}",flush=True)
+    try: await srv.serve_forever()
+    except asyncio.CancelledError: pass
+    finally: await srv.close()
+
+if __name__=="__main__":
+    import sys
+    try: asyncio.run(_main(sys.argv[1:]))
+    except KeyboardInterrupt: pass
@@ -0,0 +1,188 @@
+# spiral_sqlite_v047.py  (History on local SQLite, for ad-hoc operational queries)
+#
+#   events(pos INTEGER PRIMARY KEY, id, ts, kind, topic, observe, noise_kind, parents, meta, payload)
+#       parents / meta are JSON (order kept); kind..noise_kind are the INDEXED_META fields, one column each
+#   edges(parent, child)     one row per parent ref in append order (rowid), dangling parents included
+#   info(key PRIMARY KEY, value)
+#
+# Indexes: events(id), events(kind|topic|observe|noise_kind, pos), events(ts), edges(parent), edges(child).
+# Appends are buffered and inserted `batch` at a time in one transaction through executemany. Any read
+# flushes the buffer first, so the append-only semantics of History hold at every call.
+import json
+import sqlite3
+from collections.abc import Mapping, Sequence
+
+from spiral_core_v047 import Event, _HistoryQueries, _one_filter, meta_key
+
+_SCHEMA="""
+CREATE TABLE IF NOT EXISTS events(pos INTEGER PRIMARY KEY, id TEXT NOT NULL, ts INTEGER NOT NULL,
+    kind, topic, observe, noise_kind, parents TEXT NOT NULL, meta TEXT NOT NULL, payload TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS edges(parent TEXT NOT NULL, child TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS info(key TEXT PRIMARY KEY, value);
+CREATE INDEX IF NOT EXISTS events_id ON events(id);
+CREATE INDEX IF NOT EXISTS events_kind ON events(kind, pos) WHERE kind IS NOT NULL;
+CREATE INDEX IF NOT EXISTS events_topic ON events(topic, pos) WHERE topic IS NOT NULL;
+CREATE INDEX IF NOT EXISTS events_observe ON events(observe, pos) WHERE observe IS NOT NULL;
+CREATE INDEX IF NOT EXISTS events_noise_kind ON events(noise_kind, pos) WHERE noise_kind IS NOT NULL;
+CREATE INDEX IF NOT EXISTS events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS edges_parent ON edges(parent);
+CREATE INDEX IF NOT EXISTS edges_child ON edges(child);
+"""
+_COLS="ts, id, parents, meta, payload"
+_INS_EVENT="INSERT INTO events VALUES (?,?,?,?,?,?,?,?,?,?)"
+_INS_EDGE="INSERT INTO edges VALUES (?,?)"
+# RECENT_A ancestry: everything within ? parent hops of the seeds (a JSON list), present events only
+_ANCESTORS="""
+WITH RECURSIVE anc(id, d) AS (
+    SELECT value, 0 FROM json_each(?)
+    UNION
+    SELECT edges.parent, anc.d+1 FROM anc JOIN edges ON edges.child=anc.id WHERE anc.d<?
+)
+SELECT DISTINCT anc.id FROM anc WHERE EXISTS (SELECT 1 FROM events WHERE events.id=anc.id)
+"""
+
+_enc=json.JSONEncoder(ensure_ascii=False).encode
+
+def _event(row):
+    ts,eid,parents,meta,payload=row
+    return Event(ts,eid,json.loads(parents),json.loads(meta),payload)
+
+class _SqlEvents(Sequence):
+    # events view: one SELECT per index, one range query per slice or iteration chunk
+    __slots__=("_h",)
+    def __init__(self,h): self._h=h
+    def __len__(self): return self._h.n
+    def __getitem__(self,i):
+        h=self._h; n=h.n
+        if isinstance(i,slice):
+            lo,hi,step=i.indices(n)
+            if step!=1: return [self[j] for j in range(lo,hi,step)]
+            return h._rows(lo,hi)
+        if i<0: i+=n
+        if not 0<=i<n: raise IndexError("event index out of range")
+        return h.event(i)
+    def __iter__(self,chunk=4096):
+        h=self._h
+        for lo in range(0,h.n,chunk): yield from h._rows(lo,min(h.n,lo+chunk))
+    def __reversed__(self):
+        for i in range(self._h.n-1,-1,-1): yield self._h.event(i)
+
+class _SqlTs(Sequence):
+    # ts column view
+    __slots__=("_h",)
+    def __init__(self,h): self._h=h
+    def __len__(self): return self._h.n
+    def __getitem__(self,i):
+        h=self._h; n=h.n
+        if isinstance(i,slice): return [e.ts for e in h.events[i]]
+        if i<0: i+=n
+        if not 0<=i<n: raise IndexError("ts index out of range")
+        return h._one("SELECT ts FROM events WHERE pos=?",(i,))[0]
+
+class _SqlIds(Mapping):
+    # by_id view: the last event with each id, as in History.by_id
+    __slots__=("_h",)
+    def __init__(self,h): self._h=h
+    def __getitem__(self,eid):
+        e=self.get(eid)
+        if e is None: raise KeyError(eid)
+        return e
+    def get(self,eid,default=None):
+        row=self._h._one(f"SELECT {_COLS} FROM events WHERE id=? ORDER BY pos DESC LIMIT 1",(eid,))
+        return default if row is None else _event(row)
+    def __contains__(self,eid): return self._h._one("SELECT 1 FROM events WHERE id=?",(eid,)) is not None
+    def __len__(self): return self._h._one("SELECT COUNT(DISTINCT id) FROM events")[0]
+    def __iter__(self):
+        h=self._h; h.flush()
+        for (eid,) in h.db.execute("SELECT id FROM events GROUP BY id ORDER BY MAX(pos)"): yield eid
+
+class SqliteHistory(_HistoryQueries):
+    """History on a local SQLite file (":memory:" by default): same add/events/by_id/positions surface.
+
+    add() buffers; `batch` events go in per transaction. last(n, kind=...) is an indexed LIMIT query.
+    ancestors(seed_ids, depth) is the RECENT_A closure as one recursive CTE; closure() and frontier()
+    use it. Reopening a file continues its history."""
+    def __init__(self,path=":memory:",batch=4096,strict_ts=False):
+        self.path=path; self.batch=batch; self.strict_ts=strict_ts
+        self.db=sqlite3.connect(path); self.db.executescript(_SCHEMA)
+        self.db.execute("PRAGMA journal_mode=WAL"); self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA cache_size=-65536")  # 64 MiB: keeps the random-id index pages hot
+        n,last=self.db.execute("SELECT COUNT(*), (SELECT ts FROM events ORDER BY pos DESC LIMIT 1) FROM events").fetchone()
+        self.n=n; self._last_ts=last
+        row=self.db.execute("SELECT value FROM info WHERE key='ts_sorted'").fetchone()
+        self.ts_sorted=bool(row[0]) if row else True
+        self.pending=[]; self.pending_edges=[]; self.listeners=[]; self._metas={}  # encoded meta per shape
+        self.events=_SqlEvents(self); self.ts=_SqlTs(self); self.by_id=_SqlIds(self)
+
+    # ---- append ----
+    def subscribe(self,fn): self.listeners.append(fn)
+    def add(self,e):
+        if self._last_ts is not None and e.ts<self._last_ts:
+            if self.strict_ts: raise ValueError(f"out-of-order ts: id={e.id[:8]} ts={e.ts} < last ts={self._last_ts}")
+            self.ts_sorted=False
+        m=e.meta
+        mk=meta_key(m.items()); mj=self._metas.get(mk)
+        if mj is None: mj=self._metas[mk]=_enc(m)
+        self.pending.append((self.n,e.id,e.ts,m.get("kind"),m.get("topic"),m.get("observe"),m.get("noise_kind"),
+                             _enc(e.parent_ids),mj,e.payload))
+        self.pending_edges.extend((p,e.id) for p in e.parent_ids)
+        self.n+=1; self._last_ts=e.ts
+        if len(self.pending)>=self.batch: self.flush()
+        for fn in self.listeners: fn(e)
+
+    def flush(self):
+        # write buffered appends in one transaction
+        if not self.pending: return
+        with self.db:
+            self.db.executemany(_INS_EVENT,self.pending)
+            self.db.executemany(_INS_EDGE,self.pending_edges)
+            if not self.ts_sorted: self.db.execute("INSERT OR REPLACE INTO info VALUES ('ts_sorted', 0)")
+        self.pending.clear(); self.pending_edges.clear()
+
+    def close(self):
+        self.flush(); self.db.close()
+    def __enter__(self): return self
+    def __exit__(self,*exc): self.close()
+
+    # ---- reads (each flushes first) ----
+    def _one(self,sql,args=()):
+        self.flush()
+        return self.db.execute(sql,args).fetchone()
+    def _rows(self,lo,hi):
+        self.flush()
+        return [_event(r) for r in self.db.execute(f"SELECT {_COLS} FROM events WHERE pos>=? AND pos<? ORDER BY pos",(lo,hi))]
+
+    def __len__(self): return self.n
+    def event(self,i): return _event(self._one(f"SELECT {_COLS} FROM events WHERE pos=?",(i,)))
+    def _at(self,i): return self.event(i)
+    def children_of(self,eid):
+        self.flush()
+        return [c for (c,) in self.db.execute("SELECT child FROM edges WHERE parent=? ORDER BY rowid",(eid,))]
+
+    def positions(self,**flt):
+        f,v=_one_filter(flt); self.flush()
+        return [p for (p,) in self.db.execute(f"SELECT pos FROM events WHERE {f}=? ORDER BY pos",(v,))]
+    def last(self,n=1,**flt):
+        # last n matching events, oldest->newest; one indexed query
+        f,v=_one_filter(flt)
+        if n<=0: return []
+        self.flush()
+        rows=self.db.execute(f"SELECT {_COLS} FROM events WHERE {f}=? ORDER BY pos DESC LIMIT ?",(v,n)).fetchall()
+        return [_event(r) for r in reversed(rows)]
+
+    def index_at(self,ts):
+        if not self.ts_sorted: raise ValueError("ts index unusable: history has out-of-order timestamps (use strict_ts=True)")
+        row=self._one("SELECT pos FROM events WHERE ts>=? ORDER BY ts, pos LIMIT 1",(ts,))
+        return self.n if row is None else row[0]
+    def range(self,ts_from=None,ts_to=None):
+        # events with ts_from <= ts < ts_to (None = open end), in append order; the ts index serves both orders
+        self.flush()
+        lo=-2**63 if ts_from is None else ts_from; hi=2**63-1 if ts_to is None else ts_to
+        if ts_to is not None and hi<=lo: return []
+        return [_event(r) for r in self.db.execute(f"SELECT {_COLS} FROM events WHERE ts>=? AND ts<? ORDER BY pos",(lo,hi))]
+
+    def ancestors(self,seed_ids,depth):
+        # closure(h, seed_ids, depth) as one recursive CTE over edges(child)
+        self.flush()
+        seeds=json.dumps([s for s in seed_ids if s])
+        return {i for (i,) in self.db.execute(_ANCESTORS,(seeds,depth))}
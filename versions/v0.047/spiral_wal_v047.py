@@ -0,0 +1,122 @@
+# spiral_wal_v047.py  (write-ahead log with group commit: durable ingestion for History)
+# A WAL is one append-only file of commit frames. Little-endian.
+#
+#   frame  := body_len:u32 crc32(body):u32 body                 one group commit = one frame
+#   body   := record*
+#   record := ts:i64 meta:u32 id_len:u16 npar:u16 id (par_len:u16 par)[npar] pay_len:u32 payload
+#
+# meta is a code into the WAL's meta table. A record whose meta is 0xFFFFFFFF defines the next code: its
+# payload is the meta as JSON (id empty, no parents). A frame is written with one os.write and then fsynced.
+# If the last frame is short or its crc does not match, it was torn by a crash. That frame was never
+# committed: it is dropped and the file is truncated back to the last good frame on open.
+import json
+import os
+import struct
+import time
+import zlib
+
+from spiral_core_v047 import Event, meta_key
+
+_FRAME=struct.Struct("<II"); _REC=struct.Struct("<qIHH"); _U16=struct.Struct("<H"); _U32=struct.Struct("<I")
+DEF_META=0xFFFFFFFF
+
+class WriteAheadLog:
+    """Durable append log for a History: every h.add is logged; fsyncs are group-committed.
+
+    An event counts as durable once `committed` has passed it. A commit happens when:
+      sync_every  this many events are pending (1 = fsync per event)
+      sync_ms     the oldest pending event is this old (checked at each append; call sync() when idle)
+    and always on sync() / close(). fsync=False stops at os.write: the log then survives a process crash
+    but not a power loss.
+
+        wal=WriteAheadLog("h.wal"); h=History(); wal.replay(h); wal.attach(h)"""
+    def __init__(self,path,sync_every=1024,sync_ms=None,fsync=True):
+        self.path=path; self.sync_every=sync_every; self.sync_ms=sync_ms; self.fsync=fsync
+        self.metas={}; self.n_metas=0; self.good=0; self.stored=0  # metas: meta key -> code, for the writer
+        self.torn=self._scan()  # bytes dropped from a torn tail
+        self.fd=os.open(path,os.O_WRONLY|os.O_CREAT|os.O_APPEND,0o644)
+        if self.torn: os.ftruncate(self.fd,self.good)
+        self.buf=bytearray(); self.pending=0; self.first_t=None
+        self.committed=self.stored; self.commits=0
+
+    def _frames(self):
+        # (offset, body) of each intact frame, in order
+        if not os.path.exists(self.path): return
+        with open(self.path,"rb") as f:
+            off=0
+            while True:
+                head=f.read(_FRAME.size)
+                if len(head)<_FRAME.size: return
+                n,crc=_FRAME.unpack(head); body=f.read(n)
+                if len(body)<n or zlib.crc32(body)!=crc: return
+                yield off,body
+                off+=_FRAME.size+n
+
+    def _scan(self):
+        # meta table, event count and end of the last good frame; returns the torn tail length
+        table=[]
+        for off,body in self._frames():
+            for _ in _records(body,table): self.stored+=1
+            self.good=off+_FRAME.size+len(body)
+        # next code is the table length: keys that collide (same meta defined twice) must not shrink it
+        self.metas={meta_key(m):c for c,m in enumerate(table)}; self.n_metas=len(table)
+        return os.path.getsize(self.path)-self.good if os.path.exists(self.path) else 0
+
+    def events(self):
+        # the committed events, in append order, one frame at a time
+        table=[]
+        for _,body in self._frames():
+            yield from _records(body,table)
+
+    def replay(self,h):
+        # committed events into h (before attach); listeners subscribed to h see them as usual
+        h.extend(self.events())
+        return h
+
+    def attach(self,h):
+        # log every later h.add (subscribe after replay, or the replayed events are logged twice)
+        h.subscribe(self.append)
+
+    def append(self,e):
+        buf=self.buf
+        mk=meta_key(e.meta.items()); mc=self.metas.get(mk)
+        if mc is None:
+            mc=self.metas[mk]=self.n_metas; self.n_metas+=1; m=json.dumps(e.meta,ensure_ascii=False).encode()
+            buf+=_REC.pack(0,DEF_META,0,0); buf+=_U32.pack(len(m)); buf+=m
+        i=e.id.encode(); ps=e.parent_ids; p=e.payload.encode()
+        buf+=_REC.pack(e.ts,mc,len(i),len(ps)); buf+=i
+        for x in ps:
+            x=x.encode(); buf+=_U16.pack(len(x)); buf+=x
+        buf+=_U32.pack(len(p)); buf+=p
+        self.pending+=1
+        if self.pending>=self.sync_every: self.sync()
+        elif self.sync_ms is not None:
+            now=time.monotonic()
+            if self.first_t is None: self.first_t=now
+            elif (now-self.first_t)*1000>=self.sync_ms: self.sync()
+
+    def sync(self):
+        # group commit: one frame, one write, one fsync
+        if not self.pending: return
+        body=bytes(self.buf)
+        os.write(self.fd,_FRAME.pack(len(body),zlib.crc32(body))+body)
+        if self.fsync: os.fsync(self.fd)
+        self.committed+=self.pending; self.commits+=1
+        self.buf.clear(); self.pending=0; self.first_t=None
+
+    def close(self):
+        if self.fd is None: return
+        self.sync(); os.close(self.fd); self.fd=None
+
+def _records(body,table):
+    # Events of one frame body; meta definitions are appended to table (code -> meta items)
+    o=0; n=len(body); rec=_REC.unpack_from; u16=_U16.unpack_from; u32=_U32.unpack_from
+    while o<n:
+        ts,mc,il,npar=rec(body,o); o+=_REC.size
+        eid=body[o:o+il].decode(); o+=il
+        ps=[]
+        for _ in range(npar):
+            (pl,)=u16(body,o); o+=2; ps.append(body[o:o+pl].decode()); o+=pl
+        (pl,)=u32(body,o); o+=4; pay=body[o:o+pl].decode(); o+=pl
+        if mc==DEF_META: table.append(tuple(json.loads(pay).items())); continue
+        yield Event(ts,eid,ps,dict(table[mc]),pay)